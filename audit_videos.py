@@ -0,0 +1,56 @@
+"""
+Analyze recorded work sessions for an ergonomic assessment.
+
+Every video in the directory is split into chunks that a pool of worker processes
+analyzes in parallel. Each video gets a time series in OUTPUT/<name>.npz (one array
+per column) and a row in OUTPUT/summary.csv. Run the same command again to resume
+an interrupted audit.
+
+    python audit_videos.py recordings/ --output audit/ --workers 32 --fps 5
+"""
+import os
+os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+import argparse
+
+from components.video_audit import VideoAudit
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Audit posture in a directory of recorded videos.")
+    parser.add_argument("directory", help="Directory searched for video files, including subdirectories")
+    parser.add_argument("--output", default="audit", help="Directory for the results")
+    parser.add_argument("--workers", type=int, help="Analysis processes (default: CPU cores)")
+    parser.add_argument("--chunk-seconds", type=float, default=60, help="Length of video per task")
+    parser.add_argument("--fps", type=float, default=5, help="Frames analyzed per second of video")
+    parser.add_argument("--angle-threshold", type=float, default=160)
+    parser.add_argument("--distance-threshold-ratio", type=float, default=0.05)
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    audit = VideoAudit(
+        args.directory, args.output,
+        workers=args.workers,
+        chunk_seconds=args.chunk_seconds,
+        sample_fps=args.fps,
+        detector_options={"model_complexity": args.model_complexity},
+        evaluator_options={
+            "angle_threshold": args.angle_threshold,
+            "distance_threshold_ratio": args.distance_threshold_ratio,
+        },
+    )
+    rows = audit.run()
+    if not rows:
+        print("No videos were audited.")
+        return
+    print(f"{'video':<32}{'minutes':>9}{'bad %':>8}{'mean angle':>12}{'longest bad s':>15}")
+    for row in rows:
+        print(f"{row['video'][:31]:<32}{row['duration_seconds'] / 60:>9.1f}{str(row['bad_percent']):>8}"
+              f"{str(row['mean_angle']):>12}{row['longest_bad_seconds']:>15}")
+    print(f"Results written to {os.path.join(args.output, 'summary.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Headless benchmark for the posture detection pipeline.
+
+Feeds a recorded video, a directory of images or a landmark trace through the
+same stages as main.py and reports throughput and latency for each stage.
+Posture is evaluated with StreamingPostureEvaluator and its transitions are
+published through an AlertDispatcher to a headless GUI sink, as in the live loop.
+
+    python benchmark.py --video session.mp4
+    python benchmark.py --images frames/
+    python benchmark.py --synthetic 5000
+    python benchmark.py --trace landmarks.npy --json results.json
+    python benchmark.py --synthetic 100000 --batch
+    python benchmark.py --backends --budget-ms 40
+    python benchmark.py --video session.mp4 --memory
+"""
+import os
+os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from components.landmarks import (
+    NUM_LANDMARKS, LEFT_EAR, LEFT_SHOULDER, LEFT_HIP, RIGHT_EAR, RIGHT_SHOULDER, RIGHT_HIP,
+    PoseLandmarks, VISIBILITY, posture_metrics,
+)
+from components.posture_evaluation import StreamingPostureEvaluator
+from components.profiling import StageTimings
+from components.warnings.alert_manager import PostureAlertManager
+from components.warnings.dispatcher import AlertDispatcher
+from components.warnings.gui_warning import GUIWarning
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class HeadlessGUI:
+    """Accepts GUI alert updates without a window so the alert stage can be timed."""
+
+    def __init__(self):
+        self.color = None
+
+    def set_gui_alert(self, color):
+        self.color = color
+
+
+def headless_dispatcher():
+    """Return an AlertDispatcher delivering to a GUIWarning without a window, as the detection loop would."""
+    dispatcher = AlertDispatcher(PostureAlertManager())
+    dispatcher.register(GUIWarning(HeadlessGUI(), dispatcher.alert_manager))
+    return dispatcher
+
+
+def video_frames(path, timings):
+    """Yield decoded frames from a video file, timing the decode stage."""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {path}")
+    try:
+        while True:
+            with timings.time("decode"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def image_frames(directory, timings):
+    """Yield decoded frames from every image in a directory, in name order."""
+    import cv2
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+    if not names:
+        raise FileNotFoundError(f"No images found in: {directory}")
+    for name in names:
+        with timings.time("decode"):
+            frame = cv2.imread(os.path.join(directory, name))
+        if frame is not None:
+            yield frame
+
+
+def synthetic_trace(count):
+    """Generate a (count, 33, 4) landmark trace of a seated user drifting in and out of a slouch."""
+    trace = np.full((count, NUM_LANDMARKS, 4), 0.5, dtype=np.float32)
+    trace[:, :, 2] = 0.0
+    trace[:, :, VISIBILITY] = 0.9
+    trace[:, [RIGHT_EAR, RIGHT_SHOULDER, RIGHT_HIP], VISIBILITY] = 0.2  # Camera sees the user's left side
+    phase = np.linspace(0, 8 * math.pi, count, dtype=np.float32)
+    slouch = 0.5 + 0.5 * np.sin(phase)  # 0 = upright, 1 = slouched
+    trace[:, LEFT_HIP, 0], trace[:, LEFT_HIP, 1] = 0.50, 0.85
+    trace[:, LEFT_SHOULDER, 0], trace[:, LEFT_SHOULDER, 1] = 0.50, 0.50
+    trace[:, LEFT_EAR, 0] = 0.50 + 0.12 * slouch
+    trace[:, LEFT_EAR, 1] = 0.30 + 0.05 * slouch
+    return trace
+
+
+def load_trace(path):
+    """Load a landmark trace from a .npy array or a JSON list of frames, shaped (frames, 33, 4)."""
+    if path.endswith(".npy"):
+        trace = np.load(path)
+    else:
+        with open(path, "r") as file:
+            trace = np.asarray(json.load(file), dtype=np.float32)
+    if trace.ndim != 3 or trace.shape[1:] != (NUM_LANDMARKS, 4):
+        raise ValueError(f"Expected a (frames, {NUM_LANDMARKS}, 4) trace, got {trace.shape}")
+    return trace
+
+
+def run_frames(frames, timings, evaluator, dispatcher, fps=30.0, alert_methods=frozenset({"GUI"})):
+    """
+    Run decoded frames through color conversion, inference, metrics, evaluation and alerting.
+    - fps: Rate the frames are taken to be captured at, which sets the evaluator's timestamps.
+    """
+    from components.pose_detection import PoseDetector
+    pose_detector = PoseDetector()
+
+    processed = 0
+    for frame in frames:
+        now = processed / fps
+        with timings.time("cvtColor"):
+            image = pose_detector.to_rgb(frame)
+        with timings.time("inference"):
+            landmarks = pose_detector.detect(image)
+        processed += 1
+        if landmarks:
+            with timings.time("metrics"):
+                angle, horizontal_distance = pose_detector.calculate_metrics(landmarks, frame)
+            with timings.time("evaluation"):
+                transition = evaluator.update(now, angle, horizontal_distance, frame.shape[1])
+        else:
+            with timings.time("evaluation"):
+                transition = evaluator.update_absent(now)
+        with timings.time("alerting"):
+            if transition is not None:
+                dispatcher.publish_transition(transition, alert_methods)
+    return processed
+
+
+def run_memory(path, count=None, use_pool=True, warm_up=30):
+    """
+    Measure the memory allocated per frame by capture, color conversion, inference and metrics.
+    Frames go through Camera and PoseDetector as in the detection loop and are handed back once
+    processed. Allocations are traced with tracemalloc after warm_up frames, so model setup and
+    the pool filling up are not counted. Stages are not timed, as recording timings allocates too.
+    """
+    import gc
+    import tracemalloc
+    from components.buffer_pool import FramePool
+    from components.camera import Camera
+    from components.pose_detection import PoseDetector
+
+    pool = FramePool(count=6 if use_pool else 0)  # A pool that keeps nothing allocates every buffer
+    camera = Camera(width=640, height=480, desired_fps=float("inf"), source=path, pool=pool)  # No pacing
+    if not camera.is_opened():
+        raise FileNotFoundError(f"Could not open video: {path}")
+    pose_detector = PoseDetector(pool=pool)
+
+    processed = 0
+    transient = []  # Bytes allocated at the peak of each measured frame, over what was allocated before it
+    tracemalloc.start()
+    try:
+        while count is None or processed < warm_up + count:
+            if processed == warm_up:
+                gc.collect()
+                baseline = tracemalloc.get_traced_memory()[0]
+                allocations = pool.allocations
+                collections = [generation["collections"] for generation in gc.get_stats()]
+            if processed >= warm_up:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            frame = camera.get_frame()
+            if frame is None:
+                break
+            landmarks = pose_detector.detect(pose_detector.to_rgb(frame))
+            if landmarks:
+                pose_detector.calculate_metrics(landmarks, frame)
+            camera.release_frame(frame)
+            if processed >= warm_up:
+                transient.append(tracemalloc.get_traced_memory()[1] - before)
+            processed += 1
+        growth = tracemalloc.get_traced_memory()[0] - baseline if transient else 0
+    finally:
+        tracemalloc.stop()
+        camera.release()
+
+    if not transient:
+        print(f"video has no frames after the {warm_up} warm-up frames")
+        return processed
+    collections = [generation["collections"] - start for generation, start in zip(gc.get_stats(), collections)]
+    print(f"memory over {len(transient)} frames after {warm_up} warm-up frames "
+          f"({'frame pool' if use_pool else 'no frame pool'}):")
+    print(f"  allocated per frame: mean {np.mean(transient) / 1024:.1f} KiB, "
+          f"max {np.max(transient) / 1024:.1f} KiB")
+    print(f"  net growth: {growth / 1024:.1f} KiB")
+    print(f"  buffers allocated outside the pool: {pool.allocations - allocations}")
+    print(f"  gc collections (gen 0/1/2): {'/'.join(str(number) for number in collections)}")
+    return processed
+
+
+def run_trace(trace, timings, evaluator, dispatcher, width=640, height=480, fps=30.0,
+              alert_methods=frozenset({"GUI"})):
+    """Run a landmark trace through metrics, evaluation and alerting only; no pose model is loaded."""
+    for index, row in enumerate(trace):
+        landmarks = PoseLandmarks(row)
+        with timings.time("metrics"):
+            angle, horizontal_distance, _ = landmarks.metrics(width, height)
+        with timings.time("evaluation"):
+            transition = evaluator.update(index / fps, angle, horizontal_distance, width)
+        with timings.time("alerting"):
+            if transition is not None:
+                dispatcher.publish_transition(transition, alert_methods)
+    return len(trace)
+
+
+def run_trace_batch(trace, timings, evaluator, width=640, height=480):
+    """Compute metrics and evaluation for a whole landmark trace in single vectorized calls."""
+    with timings.time("metrics"):
+        angles, horizontal_distances, _ = posture_metrics(trace, width, height)
+    with timings.time("evaluation"):
+        is_bad_posture = (angles < evaluator.angle_threshold) | (
+            horizontal_distances > width * evaluator.distance_threshold_ratio)
+    print(f"bad posture in {is_bad_posture.mean() * 100:.1f}% of {len(trace)} frames")
+    return len(trace)
+
+
+def run_backends(timings, models_dir, budget_ms, frames=30):
+    """Time every pose backend available on this machine and show which one fits the budget."""
+    from components.pose_backends import backend_candidates, benchmark_backend, load_sample_image
+    image = load_sample_image()  # Needs a person in view, or the landmark models never run
+    chosen = None
+    measured = 0
+    for label, name, options in backend_candidates(models_dir):
+        latencies, found = benchmark_backend(name, options, image, frames)
+        if not found:
+            print(f"{label} found nobody in the sample image; its timing leaves out the landmark model")
+        for seconds in latencies:
+            timings.record(label, seconds)
+        measured += len(latencies)
+        if chosen is None and np.percentile(latencies, 95) * 1000.0 <= budget_ms:
+            chosen = label
+    print(f"most accurate backend within {budget_ms} ms (p95): {chosen or 'none'}")
+    return measured
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the posture detection pipeline headlessly.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Path to a recorded video file")
+    source.add_argument("--images", help="Directory of image files")
+    source.add_argument("--trace", help="Landmark trace (.npy or .json) shaped (frames, 33, 4)")
+    source.add_argument("--synthetic", type=int, metavar="FRAMES", help="Generate a synthetic landmark trace")
+    source.add_argument("--backends", action="store_true", help="Compare the pose backends available here")
+    parser.add_argument("--angle-threshold", type=float, default=160)
+    parser.add_argument("--distance-threshold-ratio", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=3, help="Seconds of bad posture before alerting")
+    parser.add_argument("--fps", type=float, default=30, help="Frame rate frames and traces are timestamped at")
+    parser.add_argument("--batch", action="store_true", help="Evaluate a landmark trace in one vectorized pass")
+    parser.add_argument("--json", help="Write the summary to this JSON file")
+    parser.add_argument("--memory", action="store_true",
+                        help="With --video, measure memory allocated per frame with tracemalloc")
+    parser.add_argument("--frames", type=int, help="Frames --memory measures (default: the whole video)")
+    parser.add_argument("--no-pool", action="store_true", help="Run --memory without frame buffer reuse")
+    parser.add_argument("--models-dir", default="models", help="Where --backends looks for model files")
+    parser.add_argument("--budget-ms", type=float, default=50, help="Per-frame latency budget for --backends")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timings = StageTimings()
+    evaluator = StreamingPostureEvaluator(args.angle_threshold, args.distance_threshold_ratio, args.timeout)
+    dispatcher = headless_dispatcher()
+
+    start = time.perf_counter()
+    try:
+        if args.memory:
+            if not args.video:
+                raise SystemExit("--memory needs --video")
+            frames = run_memory(args.video, args.frames, use_pool=not args.no_pool)
+        elif args.video:
+            frames = run_frames(video_frames(args.video, timings), timings, evaluator, dispatcher, args.fps)
+        elif args.images:
+            frames = run_frames(image_frames(args.images, timings), timings, evaluator, dispatcher, args.fps)
+        elif args.backends:
+            frames = run_backends(timings, args.models_dir, args.budget_ms)
+        else:
+            trace = load_trace(args.trace) if args.trace else synthetic_trace(args.synthetic)
+            if args.batch:
+                frames = run_trace_batch(trace, timings, evaluator)
+            else:
+                frames = run_trace(trace, timings, evaluator, dispatcher, fps=args.fps)
+        wall_seconds = time.perf_counter() - start
+    finally:
+        dispatcher.close()
+
+    print(timings.format_report(frames, wall_seconds))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({
+                "frames": frames,
+                "wall_seconds": wall_seconds,
+                "fps": frames / wall_seconds if wall_seconds else None,
+                "stages": timings.summary(),
+            }, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
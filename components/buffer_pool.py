@@ -0,0 +1,37 @@
+import threading
+
+class FramePool:
+    def __init__(self, count=4):
+        """
+        Recycled frame buffers, so capture and color conversion don't allocate a new array per frame.
+        Whoever acquire()s a buffer owns it until handing it to someone else or release()ing it.
+        All buffers share one shape, taken from the first buffer released; when frames change size,
+        buffers of the old size are dropped and the pool refills with the new one.
+        - count: Most free buffers kept.
+        """
+        self.count = count
+        self.shape = None
+        self.dtype = None
+        self.allocations = 0  # Times acquire() had nothing to give, so the caller allocated instead
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return a free buffer, or None if there is none; the caller then lets OpenCV allocate one."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.allocations += 1
+            return None
+
+    def release(self, buffer):
+        """Give a buffer back to the pool; the caller must not use it afterwards."""
+        if buffer is None:
+            return
+        with self._lock:
+            if buffer.shape != self.shape or buffer.dtype != self.dtype:
+                if self._free:
+                    return  # A stray size, e.g. a crop; keep the current buffers
+                self.shape, self.dtype = buffer.shape, buffer.dtype
+            if len(self._free) < self.count and not any(free is buffer for free in self._free):
+                self._free.append(buffer)
@@ -1,29 +1,161 @@
 import os
 os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
 import cv2
+import threading
 import time
 
+from components.buffer_pool import FramePool
+
 class Camera:
-    def __init__(self, width, height, desired_fps):
-        self.cap = cv2.VideoCapture(0)
+    def __init__(self, width, height, desired_fps, threaded=False, source=0, decode_on_demand=False, pool=None):
+        """
+        Open the camera.
+        - threaded: If True, a grabber thread drains the device at its native rate
+          and only the freshest frame is kept for the consumer.
+        - source: Device index, video file path or stream URL.
+        - decode_on_demand: With threaded, only decode a frame when the consumer is waiting for one;
+          other frames are grabbed and dropped undecoded, which saves CPU at low frame rates.
+        - pool: FramePool frames are read into. Frames returned by get_frame()/get_latest() belong
+          to the caller, who gives them back with release_frame() once done.
+        """
+        self.source = source
+        self.cap = cv2.VideoCapture(source)
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Files have no native rate to block on, so the grabber plays them back in real time
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS) if isinstance(source, str) and os.path.isfile(source) else 0
+        self._playback_interval = 1.0 / file_fps if file_fps > 0 else 0.0
         self.frame_time = 1.0 / desired_fps
         self.last_frame_time = time.time()
 
+        self.pool = pool if pool is not None else FramePool()
+        self.threaded = threaded
+        self.decode_on_demand = decode_on_demand
+        self._wanted = False  # A consumer is waiting for a frame
+        self.dropped_frames = 0  # Frames overwritten before the consumer picked them up
+        self._latest = None  # (frame, timestamp, frame_id)
+        self._frame_id = 0
+        self._consumed_id = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._grabber = None
+        self._grabber_done = False  # The grabber thread no longer touches the capture
+        self._release_on_exit = False  # release() gave up waiting; the grabber releases the capture itself
+        if threaded:
+            self._running = True
+            self._grabber = threading.Thread(target=self._grab_loop, daemon=True)
+            self._grabber.start()
+
     def is_opened(self):
+        if self.threaded and not self._running:
+            return False  # The grabber stopped, e.g. at the end of a file
         return self.cap.isOpened()
 
+    def _grab_loop(self):
+        """Read frames as fast as the device delivers them into the latest-frame slot."""
+        next_read = time.monotonic()
+        while self._running and self.cap.isOpened():
+            if self._playback_interval:
+                next_read += self._playback_interval
+                time.sleep(max(0.0, next_read - time.monotonic()))
+            if self.decode_on_demand and not self._wanted and not self._playback_interval:
+                if not self.cap.grab():
+                    time.sleep(0.01)
+                continue
+            ret, frame = self._read()
+            if not ret:
+                if self._playback_interval:
+                    break  # End of file
+                time.sleep(0.01)
+                continue
+            timestamp = time.time()
+            with self._condition:
+                if self._frame_id > self._consumed_id:
+                    self.dropped_frames += 1
+                    self.pool.release(self._latest[0])  # Nobody took it, so it can be reused
+                self._frame_id += 1
+                self._latest = (frame, timestamp, self._frame_id)
+                self._wanted = False
+                self._condition.notify_all()
+
+        with self._condition:
+            self._running = False
+            self._grabber_done = True
+            release = self._release_on_exit
+            self._condition.notify_all()
+        if release:
+            self.cap.release()
+
+    def _read(self):
+        """Decode the next frame into a pooled buffer."""
+        buffer = self.pool.acquire()
+        ret, frame = self.cap.read(buffer)
+        if not ret:
+            self.pool.release(buffer)
+            return False, None
+        if buffer is not None and frame is not buffer:
+            self.pool.release(buffer)  # The frame size changed; OpenCV allocated a new array
+        return True, frame
+
+    def release_frame(self, frame):
+        """Give a frame from get_frame() or get_latest() back for reuse."""
+        self.pool.release(frame)
+
+    def get_latest(self, timeout=1.0):
+        """
+        Return (frame, timestamp, frame_id) for the freshest frame not yet consumed.
+        Waits up to timeout seconds for a new frame and returns None if none arrived.
+        """
+        with self._condition:
+            if self._frame_id <= self._consumed_id:
+                self._wanted = True  # Lets an on-demand grabber decode the next frame
+            self._condition.wait_for(lambda: self._frame_id > self._consumed_id or not self._running, timeout)
+            if self._frame_id <= self._consumed_id:
+                return None
+            self._consumed_id = self._frame_id
+            return self._latest
+
+    def set_fps(self, desired_fps):
+        """Change the rate get_frame() delivers frames at."""
+        self.frame_time = 1.0 / desired_fps
+
+    def pace(self):
+        """Sleep until the next frame is due at the rate set by set_fps(), so get_frame() won't have to."""
+        remaining = self.frame_time - (time.time() - self.last_frame_time)
+        if remaining > 0:
+            time.sleep(remaining)
+
     def get_frame(self):
         current_time = time.time()
         elapsed_time = current_time - self.last_frame_time
+
+        if self.threaded:
+            # Pace the consumer, then hand over whatever is freshest
+            self.pace()
+            latest = self.get_latest()
+            if latest is None:
+                return None
+            self.last_frame_time = time.time()
+            return latest[0]
+
         if elapsed_time < self.frame_time:
             time.sleep(self.frame_time - elapsed_time)
             return None
         self.last_frame_time = current_time
-        ret, frame = self.cap.read()
+        ret, frame = self._read()
         return frame if ret else None
 
     def release(self):
-        self.cap.release()
-        cv2.destroyAllWindows()
+        """
+        Stop the grabber and release the capture. A grabber still blocked in a read after
+        a second releases the capture itself once that read returns, never while it's in use.
+        """
+        if self._grabber is not None:
+            self._running = False
+            self._grabber.join(timeout=1.0)
+            self._grabber = None
+            with self._condition:
+                # Decided under the lock the grabber takes on its way out, so exactly one side releases
+                self._release_on_exit = not self._grabber_done
+        if not self._release_on_exit:
+            self.cap.release()
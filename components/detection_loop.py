@@ -0,0 +1,360 @@
+import os
+os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+import time
+import cv2
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from components.buffer_pool import FramePool
+from components.camera import Camera
+from components.duty_cycle import DutyCycleScheduler
+from components.history import PostureHistoryWriter
+from components.keypoint_tracker import KeypointTracker
+from components.metrics_server import MetricsServer
+from components.motion_gate import MotionGate
+from components.multiprocess_pipeline import MultiprocessPipeline
+from components.pipeline import LocalPipeline
+from components.pose_backends import select_backend
+from components.pose_detection import PoseDetector
+from components.preview import PreviewRenderer
+from components.posture_evaluation import StreamingPostureEvaluator, BAD
+from components.profiling import PipelineStats, LogReporter, JsonFileReporter
+from components.startup import StartupProfile
+from components.warnings.alert_manager import PostureAlertManager
+from components.warnings.dispatcher import AlertDispatcher, make_event, METHODS_CHANGED, READOUT
+from components.warnings.sound_warning import SoundWarning
+from components.warnings.webhook_warning import WebhookWarning, UnixSocketWarning
+
+
+def create_stats(app):
+    """
+    Set up pipeline stats, the reporter selected by "stats_reporter" in settings.txt and the
+    metrics server if "metrics_address" is set. Returns the stats and the reporters to stop on exit.
+    """
+    reporter_name = app.settings.get("stats_reporter")  # "log", "json", "gui" or None
+    metrics_address = app.settings.get("metrics_address")
+    interval = app.settings.get("stats_interval", 10)
+    stats = PipelineStats(enabled=bool(reporter_name or metrics_address))
+    reporters = []
+    if reporter_name == "log":
+        reporters.append(LogReporter(stats, interval).start())
+    elif reporter_name == "json":
+        reporters.append(JsonFileReporter(stats, app.settings.get("stats_file", "stats.json"), interval).start())
+    elif reporter_name == "gui" and hasattr(app, "show_stats"):
+        app.show_stats(stats, int(interval * 1000))
+    if metrics_address:
+        try:
+            server = MetricsServer(stats, metrics_address, app.settings.get("metrics_interval", 1.0))
+            reporters.append(server.start())
+            print(f"Serving metrics on {metrics_address}")
+        except (OSError, ValueError) as e:
+            print(f"Could not start the metrics server on {metrics_address}: {e}")
+    return stats, reporters
+
+
+def pose_detector_options(app, benchmark_image=None):
+    """
+    Return PoseDetector keyword arguments from the model, backend and ROI options in settings.txt.
+    With "pose_backend" set to "auto", the backend is picked by benchmarking this machine.
+    - benchmark_image: RGB image, or function returning one, to benchmark on; see select_backend.
+    """
+    options = {
+        "model_complexity": app.settings.get("model_complexity", 1),
+        "min_detection_confidence": app.settings.get("min_detection_confidence", 0.5),
+        "min_tracking_confidence": app.settings.get("min_tracking_confidence", 0.5),
+        "roi": app.settings.get("roi", False),
+        "roi_margin": app.settings.get("roi_margin", 0.3),
+        "inference_size": app.settings.get("inference_size", 256),
+    }
+    backend = app.settings.get("pose_backend", "mediapipe")
+    if backend == "auto":
+        _, backend, backend_options = select_backend(
+            app.settings.get("latency_budget_ms", 50), app.settings.get("models_dir", "models"),
+            image=benchmark_image,
+        )
+        backend_options = dict(backend_options)
+        options["model_complexity"] = backend_options.pop("model_complexity", options["model_complexity"])
+    elif app.settings.get("pose_model_path"):
+        backend_options = {"model_path": app.settings["pose_model_path"]}
+    else:
+        backend_options = {}
+    options["backend"] = backend
+    options["backend_options"] = backend_options
+    return options
+
+
+def create_pose_detector(app, pool=None, benchmark_image=None):
+    """Create the PoseDetector using model and ROI options from settings.txt."""
+    return PoseDetector(**pose_detector_options(app, benchmark_image), pool=pool)
+
+
+def motion_gate_options(app):
+    """Return MotionGate keyword arguments, or None if "motion_gate" is not enabled in settings.txt."""
+    if not app.settings.get("motion_gate", False):
+        return None
+    return {
+        "threshold": app.settings.get("motion_threshold", 3.0),
+        "max_stale_seconds": app.settings.get("motion_max_stale_seconds", 2.0),
+    }
+
+
+def create_motion_gate(app):
+    """Create a MotionGate if "motion_gate" is enabled in settings.txt."""
+    options = motion_gate_options(app)
+    return MotionGate(**options) if options is not None else None
+
+
+def tracker_options(app):
+    """Return KeypointTracker keyword arguments if "tracking" is enabled in settings.txt, else None."""
+    if not app.settings.get("tracking", False):
+        return None
+    return {"redetect_interval": app.settings.get("redetect_interval", 10)}
+
+
+def create_tracker(app):
+    """Create a KeypointTracker if "tracking" is enabled in settings.txt."""
+    options = tracker_options(app)
+    return KeypointTracker(**options) if options is not None else None
+
+
+def configured_alert_methods(app):
+    """Return the alert methods named in the settings file."""
+    return frozenset(app.settings.get("alert_sinks", [])) | {app.settings.get("alert_method")}
+
+
+def create_stream_deck_warning(alert_manager):
+    """Load the optional Stream Deck plugin; returns None if the library or a deck is missing."""
+    try:
+        from components.warnings.stream_deck_warning import StreamDeckWarning
+        return StreamDeckWarning(alert_manager)
+    except Exception as e:
+        print(f"Stream Deck alerts disabled: {e}")
+        return None
+
+
+def create_alert_dispatcher(app, alert_manager):
+    """
+    Register every configured alert sink with a new AlertDispatcher.
+    The GUI and Stream Deck sinks are plugins: the GUI sink is only loaded when the app has a
+    window, and the Stream Deck only when the dropdown can pick it or the settings name it.
+    """
+    dispatcher = AlertDispatcher(alert_manager)
+    has_window = hasattr(app, "set_gui_alert")
+    if has_window:
+        from components.warnings.gui_warning import GUIWarning
+        dispatcher.register(GUIWarning(app, alert_manager))
+    dispatcher.register(SoundWarning(
+        alert_manager,
+        output=app.settings.get("sound_output"),
+        cooldown=app.settings.get("sound_cooldown", 5.0),
+    ))
+    if has_window or "StreamDeck" in configured_alert_methods(app):
+        stream_deck = create_stream_deck_warning(alert_manager)
+        if stream_deck is not None:
+            dispatcher.register(stream_deck)
+    if app.settings.get("webhook_url"):
+        dispatcher.register(WebhookWarning(app.settings["webhook_url"]))
+    if app.settings.get("alert_socket"):
+        dispatcher.register(UnixSocketWarning(app.settings["alert_socket"]))
+    return dispatcher
+
+
+def create_scheduler(app, pipeline):
+    """
+    Create a DutyCycleScheduler if "adaptive_rate" is enabled in settings.txt.
+    Its "cpu_budget" covers the pipeline's own processes too, with the multiprocess engine.
+    """
+    if not app.settings.get("adaptive_rate", False):
+        return None
+    return DutyCycleScheduler(
+        alert_fps=app.settings.get("alert_fps", 10),
+        active_fps=app.settings.get("active_fps", 5),
+        stable_fps=app.settings.get("stable_fps", 2),
+        away_fps=app.settings.get("away_fps", 0.5),
+        cpu_budget=app.settings.get("cpu_budget"),
+        cpu_clock=pipeline.cpu_time,
+    )
+
+
+def create_history(app):
+    """Open the posture history log named by "history_file" in settings.txt, if any."""
+    path = app.settings.get("history_file")
+    return PostureHistoryWriter(path) if path else None
+
+
+def load_pose_detector(app, startup, width, height, pool=None, benchmark_image=None):
+    """Build the PoseDetector and run its warm-up inference."""
+    with startup.phase("model"):
+        pose_detector = create_pose_detector(app, pool, benchmark_image)
+    with startup.phase("warm-up inference"):
+        pose_detector.warm_up(width, height)
+    return pose_detector
+
+
+def first_camera_frame(camera_future, timeout=5.0):
+    """Wait for the camera being opened on another thread and return its first frame as RGB, or None."""
+    try:
+        camera = camera_future.result(timeout)
+        latest = camera.get_latest(timeout)
+    except Exception:
+        return None  # The camera failed to open; create_pipeline reports that itself
+    if latest is None:
+        return None
+    image = cv2.cvtColor(latest[0], cv2.COLOR_BGR2RGB)
+    camera.release_frame(latest[0])
+    return image
+
+
+def create_pipeline(app, stats, startup=None):
+    """
+    Create the capture/inference pipeline selected by "engine" in settings.txt.
+    The camera opens while the pose model loads and warms up on another thread.
+    """
+    startup = startup or StartupProfile(enabled=False)
+    if app.settings.get("engine") == "multiprocess":
+        print("Starting capture and inference processes")
+        with startup.phase("start processes"):
+            return MultiprocessPipeline(
+                width=640, height=480, fps=10,
+                detector_options=pose_detector_options(app),
+                motion_gate_options=motion_gate_options(app),
+                stats=stats,
+                tracker_options=tracker_options(app),
+            )
+    # Camera frames and the detector's RGB conversions recycle the same buffers
+    pool = FramePool(count=6)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader") as executor:
+        # If "auto" has to benchmark the backends, it does so on the first camera frame
+        camera_future = Future()
+        pose_detector = executor.submit(load_pose_detector, app, startup, 640, 480, pool,
+                                        lambda: first_camera_frame(camera_future))
+        print("Turning on camera")
+        try:
+            with startup.phase("camera open"):
+                # At the low rates of adaptive_rate, most frames are dropped; skip decoding them
+                camera = Camera(width=640, height=480, desired_fps=10, threaded=True,
+                                decode_on_demand=app.settings.get("adaptive_rate", False), pool=pool)
+        except Exception as e:
+            camera_future.set_exception(e)
+            raise
+        camera_future.set_result(camera)
+        print("Camera is on")
+        return LocalPipeline(camera, pose_detector.result(), create_motion_gate(app), stats, create_tracker(app))
+
+
+def start_posture_detection(app, stats=None, stop_event=None, startup=None):
+    """
+    Run posture detection while dynamically fetching settings from the app.
+    - app: Settings provider, PostureGUI or HeadlessSettings.
+    - stop_event: Optional threading.Event; the loop ends cleanly once it is set.
+    - startup: Optional StartupProfile, reported after the first posture evaluation.
+    """
+    if stats is None:
+        stats = PipelineStats(enabled=False)
+    startup = startup or StartupProfile(enabled=False)
+    pipeline = create_pipeline(app, stats, startup)
+    alert_manager = PostureAlertManager()
+    with startup.phase("alert sinks"):
+        dispatcher = create_alert_dispatcher(app, alert_manager)
+    history = create_history(app)
+    scheduler = create_scheduler(app, pipeline)
+    current_fps = None
+    current_mode = None
+    extra_alert_methods = frozenset(app.settings.get("alert_sinks", []))  # Methods active besides the dropdown
+    settings = app.get_settings()
+    posture_evaluator = StreamingPostureEvaluator(
+        settings.angle_threshold, settings.distance_threshold_ratio, settings.timeout,
+        recovery_time=app.settings.get("recovery_time", 0.0),
+        absence_timeout=app.settings.get("absence_timeout", 3.0),
+    )
+
+    preview = PreviewRenderer(max_fps=app.settings.get("preview_fps", 15))
+
+    last_settings = None
+    last_alert_methods = None  # Alert sinks are refreshed when the active methods change
+
+    while pipeline.is_running() and not (stop_event is not None and stop_event.is_set()):
+        result = pipeline.next_result()
+        if result is None:
+            stats.increment("frames_skipped")
+            continue
+        frame, landmarks = result.frame, result.landmarks
+        stats.increment("frames_processed")
+        if not startup.finished:
+            startup.mark("first frame")
+
+        # Fetch current thresholds and settings with a single read of the app's snapshot
+        settings = app.get_settings()
+        if settings is not last_settings:  # A new snapshot means something changed
+            alert_methods = extra_alert_methods | {settings.alert_method}
+            posture_evaluator.set_thresholds(settings.angle_threshold, settings.distance_threshold_ratio, settings.timeout)
+            preview.set_visible(settings.show_camera)  # Check if the camera feed should be shown
+            last_settings = settings
+
+        angle = horizontal_distance = None
+        now = result.timestamp
+        if landmarks:
+            with stats.stage("evaluation"):
+                angle, horizontal_distance = result.metrics
+                transition = posture_evaluator.update(now, angle, horizontal_distance, frame.shape[1])
+        else:
+            stats.increment("no_landmark_frames")
+            transition = posture_evaluator.update_absent(now)  # Resets the timers once the user is gone
+        if not startup.finished:
+            startup.finish()
+        if stats.enabled:
+            stats.set_status("posture", posture_evaluator.state)
+            stats.set_status("present", landmarks is not None)
+            stats.set_status("angle", angle)
+            stats.set_status("horizontal_distance", horizontal_distance)
+            stats.set_status("window", posture_evaluator.window_stats())
+        if history is not None:
+            with stats.stage("history"):
+                history.append(
+                    time.time(), angle, horizontal_distance, landmarks.visibility() if landmarks else 0.0,
+                    posture_evaluator.state == BAD, landmarks is not None,
+                )
+
+        # Slow down while the user is away or sitting well, speed up when posture is at risk
+        if scheduler is not None:
+            fps = scheduler.update(now, landmarks is not None, angle, horizontal_distance, frame.shape[1],
+                                   posture_evaluator)
+            if fps != current_fps:
+                pipeline.set_fps(fps)
+                current_fps = fps
+            if scheduler.mode != current_mode:
+                print(f"Duty cycle: {scheduler.mode} at {fps:g} fps")
+                current_mode = scheduler.mode
+            stats.set_counter("duty_cycle_fps", round(fps, 2))
+            stats.set_counter("duty_cycle_mode", scheduler.mode)
+
+        # Alert sinks only hear about state changes, or a change of alert methods
+        with stats.stage("alerts"):
+            if transition is not None:
+                dispatcher.publish_transition(transition, alert_methods)
+                if transition.state == BAD:
+                    stats.increment("alerts_fired")
+            if alert_methods != last_alert_methods:
+                dispatcher.publish(make_event(
+                    METHODS_CHANGED, now, posture_evaluator.state, alert_methods, angle, horizontal_distance
+                ))
+                last_alert_methods = alert_methods
+            if "StreamDeck" in alert_methods:
+                dispatcher.publish(make_event(
+                    READOUT, now, posture_evaluator.state, alert_methods, angle, horizontal_distance,
+                    posture_evaluator.pending_seconds(), posture_evaluator.timeout,
+                ))
+
+        # The preview copies the frame at its own rate and draws on its own thread
+        if preview.visible:
+            with stats.stage("preview"):
+                preview.submit(frame, landmarks, angle)
+        pipeline.release(result)
+        if preview.quit_requested:  # "q" pressed in the preview window
+            break
+
+    # Clean up resources
+    preview.close()
+    pipeline.close()
+    dispatcher.close()
+    if history is not None:
+        history.close()
@@ -0,0 +1,98 @@
+import time
+
+from components.posture_evaluation import BAD
+
+# Scheduler modes, from the lowest rate to the highest
+AWAY = "away"  # Nobody seen for a while
+STABLE = "stable"  # Posture has been comfortably good for a while
+ACTIVE = "active"  # Somebody is there, but posture is not settled yet
+ALERT = "alert"  # Posture is near the thresholds, a bad-posture timer is running, or it is bad
+
+class DutyCycleScheduler:
+    def __init__(self, alert_fps=10, active_fps=5, stable_fps=2, away_fps=0.5, away_after=10.0, stable_after=30.0,
+                 angle_margin=10.0, distance_margin_ratio=0.02, cpu_budget=None, cpu_window=2.0,
+                 cpu_clock=time.process_time):
+        """
+        Choose the capture and inference rate from posture state and presence.
+        Rates drop step by step while things are calm and jump straight to alert_fps when posture
+        nears the thresholds, so a slouch is still caught on time.
+        - away_after: Seconds without landmarks before switching to away_fps.
+        - stable_after: Seconds of good posture, clear of the margins, before switching to stable_fps.
+        - angle_margin, distance_margin_ratio: How close to the thresholds counts as near them.
+        - cpu_budget: CPU time the process may use, as a fraction of one core (e.g. 0.25), or None.
+          The rate is capped at what the measured CPU cost per frame allows, but never below away_fps.
+        - cpu_window: Seconds over which CPU usage is measured.
+        - cpu_clock: Returns the CPU seconds used so far. The default only counts this process;
+          pass the pipeline's cpu_time when capture or inference run in child processes.
+        """
+        self.rates = {AWAY: away_fps, STABLE: stable_fps, ACTIVE: active_fps, ALERT: alert_fps}
+        self.away_after = away_after
+        self.stable_after = stable_after
+        self.angle_margin = angle_margin
+        self.distance_margin_ratio = distance_margin_ratio
+        self.cpu_budget = cpu_budget
+        self.cpu_window = cpu_window
+        self.cpu_clock = cpu_clock
+
+        self.mode = ACTIVE
+        self.fps = active_fps
+        self.cpu_usage = None  # Fraction of one core used during the last window
+        self.cpu_cap = None  # Highest rate the CPU budget allows, once measured
+        self._last_seen = None  # When landmarks were last found
+        self._calm_since = None  # Start of the current stretch of comfortably good posture
+        self._window_start = None  # (wall time, process CPU time, frames) at the start of the CPU window
+        self._frames = 0
+
+    def _near_thresholds(self, angle, horizontal_distance, width, evaluator):
+        return (angle < evaluator.angle_threshold + self.angle_margin
+                or horizontal_distance > width * (evaluator.distance_threshold_ratio - self.distance_margin_ratio))
+
+    def _measure_cpu(self, now):
+        """Update the CPU usage and the budget's rate cap once per window."""
+        self._frames += 1
+        cpu_time = self.cpu_clock()
+        if self._window_start is None:
+            self._window_start = (now, cpu_time, self._frames)
+            return
+        start, start_cpu, start_frames = self._window_start
+        if now - start < self.cpu_window:
+            return
+        used = cpu_time - start_cpu
+        self.cpu_usage = used / (now - start)
+        frames = self._frames - start_frames
+        if self.cpu_budget and frames and used > 0:
+            self.cpu_cap = self.cpu_budget / (used / frames)
+        self._window_start = (now, cpu_time, self._frames)
+
+    def update(self, now, present, angle, horizontal_distance, width, evaluator):
+        """
+        Pick the mode after one evaluated frame and return the rate (fps) to run at.
+        - present: Whether landmarks were found in the frame.
+        - evaluator: The StreamingPostureEvaluator the frame was fed to.
+        """
+        if self._last_seen is None:
+            self._last_seen = now
+        if present:
+            self._last_seen = now
+            if (evaluator.state == BAD or evaluator.pending_seconds() > 0
+                    or self._near_thresholds(angle, horizontal_distance, width, evaluator)):
+                self.mode = ALERT
+                self._calm_since = None
+            else:
+                if self._calm_since is None:
+                    self._calm_since = now
+                self.mode = STABLE if now - self._calm_since >= self.stable_after else ACTIVE
+        else:
+            self._calm_since = None
+            self.mode = AWAY if now - self._last_seen >= self.away_after else ACTIVE
+
+        self._measure_cpu(now)
+        fps = self.rates[self.mode]
+        if self.cpu_cap is not None:
+            fps = max(min(fps, self.cpu_cap), self.rates[AWAY])
+        self.fps = fps
+        return fps
+
+    def status(self):
+        """Return the current mode, rate and CPU usage."""
+        return {"mode": self.mode, "fps": self.fps, "cpu_usage": self.cpu_usage, "cpu_cap_fps": self.cpu_cap}
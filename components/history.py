@@ -0,0 +1,239 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+# One fixed-width record per evaluated frame
+HISTORY_DTYPE = np.dtype([
+    ("timestamp", "<f8"),  # Wall-clock seconds since the epoch
+    ("angle", "<f4"),  # NaN when nobody was detected
+    ("horizontal_distance", "<f4"),
+    ("visibility", "<f4"),  # Mean visibility of the ear, shoulder and hip used for the metrics
+    ("bad", "u1"),  # Debounced posture state: 1 while the posture is BAD
+    ("present", "u1"),  # 1 if landmarks were found in the frame
+])
+
+# One row per hour of history, kept in a small sidecar file next to the log
+HOURLY_DTYPE = np.dtype([
+    ("hour", "<i8"),  # Start of the hour, seconds since the epoch
+    ("frames", "<u4"),
+    ("present_frames", "<u4"),
+    ("bad_frames", "<u4"),  # Frames that were both present and BAD
+    ("angle_sum", "<f8"),  # Sum of the angle over present frames, for averages
+])
+
+MAGIC = b"PFHIST01"
+HEADER_SIZE = 16  # Magic, then the record size as a little-endian u8
+HOUR = 3600
+
+
+def _header(dtype):
+    return MAGIC + np.uint64(dtype.itemsize).astype("<u8").tobytes()
+
+
+def _check_header(path, dtype):
+    with open(path, "rb") as file:
+        if file.read(HEADER_SIZE) != _header(dtype):
+            raise ValueError(f"{path} is not a posture history file of this version")
+
+
+class PostureHistoryWriter:
+    def __init__(self, path, batch_size=600, flush_interval=10.0):
+        """
+        Append per-frame posture records to a binary log.
+        Records collect in a preallocated batch that a background thread appends to the file,
+        so the detection loop never waits on disk.
+        - batch_size: Records per write; 600 is one minute at 10 fps.
+        - flush_interval: Seconds after which a partial batch is written anyway.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._last_timestamp = float("-inf")  # Records must stay in time order for PostureHistory
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _check_header(path, HISTORY_DTYPE)
+            # A crash can leave half a record at the end; drop it so later records stay aligned
+            partial = (os.path.getsize(path) - HEADER_SIZE) % HISTORY_DTYPE.itemsize
+            if partial:
+                os.truncate(path, os.path.getsize(path) - partial)
+            self._file = open(path, "ab")
+            if os.path.getsize(path) > HEADER_SIZE:
+                with open(path, "rb") as file:
+                    file.seek(-HISTORY_DTYPE.itemsize, os.SEEK_END)
+                    last = np.frombuffer(file.read(HISTORY_DTYPE.itemsize), dtype=HISTORY_DTYPE)
+                self._last_timestamp = float(last["timestamp"][0])
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header(HISTORY_DTYPE))
+            self._file.flush()
+
+        self._batch = np.zeros(batch_size, dtype=HISTORY_DTYPE)
+        self._count = 0
+        self._batch_started = time.monotonic()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, timestamp, angle, horizontal_distance, visibility, bad, present):
+        """
+        Add one record; angle and horizontal_distance may be None when nobody was detected.
+        A timestamp earlier than the last one, e.g. after the clock was set back, is clamped to
+        it, since queries binary-search the timestamps.
+        """
+        if timestamp < self._last_timestamp:
+            timestamp = self._last_timestamp
+        self._last_timestamp = timestamp
+        self._batch[self._count] = (
+            timestamp,
+            np.nan if angle is None else angle,
+            np.nan if horizontal_distance is None else horizontal_distance,
+            visibility, bad, present,
+        )
+        self._count += 1
+        if self._count == self.batch_size or time.monotonic() - self._batch_started >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Hand the current batch to the writer thread and start a new one."""
+        if self._count:
+            self._queue.put(self._batch[:self._count])
+            self._batch = np.zeros(self.batch_size, dtype=HISTORY_DTYPE)
+            self._count = 0
+        self._batch_started = time.monotonic()
+
+    def _write_loop(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                self._file.write(batch.tobytes())
+                self._file.flush()
+            except OSError as e:
+                print(f"Error writing posture history: {e}")
+
+    def close(self):
+        """Write any buffered records and close the file."""
+        self.flush()
+        self._queue.put(None)
+        self._writer.join(timeout=5.0)
+        self._file.close()
+
+
+class PostureHistory:
+    def __init__(self, path):
+        """
+        Read a posture history log through a memory map, so queries never load it whole.
+        Hourly totals are cached in "<path>.hourly" and only extended with records added since.
+        """
+        self.path = path
+        self.rollup_path = path + ".hourly"
+
+    def records(self):
+        """Return a read-only memory-mapped array of every complete record written so far."""
+        if not os.path.exists(self.path):
+            return np.zeros(0, dtype=HISTORY_DTYPE)
+        _check_header(self.path, HISTORY_DTYPE)
+        count = (os.path.getsize(self.path) - HEADER_SIZE) // HISTORY_DTYPE.itemsize
+        if count <= 0:
+            return np.zeros(0, dtype=HISTORY_DTYPE)
+        return np.memmap(self.path, dtype=HISTORY_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    def __len__(self):
+        return len(self.records())
+
+    def between(self, start=None, end=None):
+        """
+        Return the memory-mapped records with start <= timestamp < end.
+        Records are appended in time order, so this is a binary search rather than a scan.
+        """
+        records = self.records()
+        timestamps = records["timestamp"]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = len(records) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return records[first:last]
+
+    @staticmethod
+    def aggregate_hours(records, chunk_size=1 << 20):
+        """Sum records into HOURLY_DTYPE rows, scanning chunk_size records at a time."""
+        rollups = []
+        for begin in range(0, len(records), chunk_size):
+            chunk = records[begin:begin + chunk_size]
+            hours = (chunk["timestamp"] // HOUR).astype(np.int64)
+            first_hour = hours[0]
+            bins = hours - first_hour
+            length = int(bins[-1]) + 1
+            present = chunk["present"].astype(bool)
+            angles = np.where(present, chunk["angle"], 0.0)
+            rows = np.zeros(length, dtype=HOURLY_DTYPE)
+            rows["hour"] = (first_hour + np.arange(length)) * HOUR
+            rows["frames"] = np.bincount(bins, minlength=length)
+            rows["present_frames"] = np.bincount(bins, weights=present, minlength=length)
+            rows["bad_frames"] = np.bincount(bins, weights=present & (chunk["bad"] == 1), minlength=length)
+            rows["angle_sum"] = np.bincount(bins, weights=angles, minlength=length)
+            rollups.append(rows[rows["frames"] > 0])
+        return _merge_hours(rollups)
+
+    def _load_rollups(self):
+        """Return (records covered, hourly rows) from the sidecar file, or (0, empty) if there is none."""
+        try:
+            with open(self.rollup_path, "rb") as file:
+                covered = int(np.frombuffer(file.read(8), dtype="<u8")[0])
+                rows = np.frombuffer(file.read(), dtype=HOURLY_DTYPE).copy()
+            return covered, rows
+        except (OSError, IndexError, ValueError):
+            return 0, np.zeros(0, dtype=HOURLY_DTYPE)
+
+    def update_rollups(self):
+        """Fold records written since the last call into the hourly rollups and save them."""
+        records = self.records()
+        covered, rows = self._load_rollups()
+        if covered > len(records):  # The log was replaced; start over
+            covered, rows = 0, np.zeros(0, dtype=HOURLY_DTYPE)
+        if covered == len(records):
+            return rows
+        rows = _merge_hours([rows, self.aggregate_hours(records[covered:])])
+        temp_path = self.rollup_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(np.uint64(len(records)).astype("<u8").tobytes())
+                file.write(rows.tobytes())
+            os.replace(temp_path, self.rollup_path)
+        except OSError as e:
+            print(f"Error saving posture history rollups: {e}")
+        return rows
+
+    def hourly(self, start=None, end=None):
+        """Return HOURLY_DTYPE rows for the hours starting in [start, end)."""
+        rows = self.update_rollups()
+        if start is not None:
+            rows = rows[rows["hour"] >= start // HOUR * HOUR]
+        if end is not None:
+            rows = rows[rows["hour"] < end]
+        return rows
+
+    def bad_posture_by_hour(self, days=30, now=None):
+        """
+        Return (hour starts, percentage of bad posture) for the last days, counting only
+        frames where someone was present. Hours with nobody present are left out.
+        """
+        now = time.time() if now is None else now
+        rows = self.hourly(start=now - days * 24 * HOUR)
+        rows = rows[rows["present_frames"] > 0]
+        return rows["hour"], rows["bad_frames"] * 100.0 / rows["present_frames"]
+
+
+def _merge_hours(parts):
+    """Combine HOURLY_DTYPE arrays sorted by hour, adding up rows for the same hour."""
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return np.zeros(0, dtype=HOURLY_DTYPE)
+    rows = np.concatenate(parts)
+    hours, inverse = np.unique(rows["hour"], return_inverse=True)
+    merged = np.zeros(len(hours), dtype=HOURLY_DTYPE)
+    merged["hour"] = hours
+    for field in ("frames", "present_frames", "bad_frames", "angle_sum"):
+        merged[field] = np.bincount(inverse, weights=rows[field], minlength=len(hours))
+    return merged
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+from components.landmarks import PoseLandmarks, SIDE_LANDMARKS, UPPER_BODY_LANDMARKS, X, Y, VISIBILITY
+
+class KeypointTracker:
+    def __init__(self, redetect_interval=10, scale=0.5, win_size=(15, 15), max_level=2, max_fb_error=1.0,
+                 min_visibility=0.5):
+        """
+        Move the ear, shoulder and hip landmarks between pose inferences with Lucas-Kanade optical flow.
+        - redetect_interval: Run the pose model at least every this many frames.
+        - scale: Frames are downscaled by this factor before tracking.
+        - win_size, max_level: Search window and pyramid depth of cv2.calcOpticalFlowPyrLK.
+        - max_fb_error: Largest forward-backward error (px, at the tracking scale) a point may have;
+          if any point of the side used for the metrics exceeds it, the pose model runs again.
+        - min_visibility: Landmarks less visible than this at the last inference are not tracked.
+        """
+        self.redetect_interval = redetect_interval
+        self.scale = scale
+        self.win_size = win_size
+        self.max_level = max_level
+        self.max_fb_error = max_fb_error
+        self.min_visibility = min_visibility
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+
+        self.landmarks = PoseLandmarks()  # Tracked landmarks, returned by every successful track()
+        self.confidence = None  # Fraction of tracked points that passed the last forward-backward check
+        self._small = None  # Reused downscale buffer
+        self._gray = None  # Thumbnail of the current frame
+        self._previous = None  # Thumbnail of the last frame tracked from
+        self._indices = None  # Landmark indices being tracked
+        self._points = None  # Their positions in the previous thumbnail, shaped (n, 1, 2) float32
+        self._required = None  # Mask of the points the metrics depend on
+        self._frames_tracked = 0
+
+    def _thumbnail(self, frame):
+        if self.scale != 1.0:
+            height, width = frame.shape[:2]
+            size = (int(width * self.scale), int(height * self.scale))
+            frame = self._small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def start(self, frame, landmarks):
+        """Start tracking from landmarks the pose model just found in frame."""
+        np.copyto(self.landmarks.data, landmarks.data)
+        data = self.landmarks.data
+        indices = UPPER_BODY_LANDMARKS[data[UPPER_BODY_LANDMARKS, VISIBILITY] >= self.min_visibility]
+        required = SIDE_LANDMARKS[self.landmarks.best_side()]
+        if not np.isin(required, indices).all():
+            self.reset()  # The side used for the metrics is not visible enough to follow
+            return
+
+        gray = self._thumbnail(frame)
+        height, width = gray.shape[:2]
+        self._indices = indices
+        self._required = np.isin(indices, required)
+        self._points = (data[indices, :2] * (width, height)).astype(np.float32).reshape(-1, 1, 2)
+        self._gray, self._previous = self._previous, gray
+        self._frames_tracked = 0
+
+    def track(self, frame):
+        """
+        Return the landmarks moved to this frame, or None when the pose model should run instead:
+        nothing is being tracked, redetect_interval was reached, or a needed point was lost.
+        The returned object is reused by the next call.
+        """
+        if self._points is None or self._frames_tracked + 1 >= self.redetect_interval:
+            return None
+        gray = self._thumbnail(frame)
+        points, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._previous, gray, self._points, None,
+            winSize=self.win_size, maxLevel=self.max_level, criteria=self.criteria,
+        )
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._previous, points, None,
+            winSize=self.win_size, maxLevel=self.max_level, criteria=self.criteria,
+        )
+        # Forward-backward check: a point that doesn't track back to where it started is unreliable
+        error = np.abs(back - self._points).reshape(-1, 2).max(axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < self.max_fb_error)
+        self.confidence = float(good.mean())
+        if not good[self._required].all():
+            self.reset()
+            return None
+
+        height, width = gray.shape[:2]
+        data = self.landmarks.data
+        moved = points.reshape(-1, 2)
+        data[self._indices[good], X] = moved[good, 0] / width
+        data[self._indices[good], Y] = moved[good, 1] / height
+        data[self._indices[~good], VISIBILITY] = 0.0  # Lost points would otherwise stay at stale positions
+        # Keep following only the points that passed
+        self._indices = self._indices[good]
+        self._required = self._required[good]
+        self._points = points[good]
+        self._gray, self._previous = self._previous, gray
+        self._frames_tracked += 1
+        return self.landmarks
+
+    def reset(self):
+        """Stop tracking so the next frame goes to the pose model."""
+        self._points = None
@@ -0,0 +1,90 @@
+import numpy as np
+from components.utils import calculate_angle, calculate_angles
+
+# MediaPipe Pose landmark indices used by the posture metrics
+NUM_LANDMARKS = 33
+LEFT_EAR, RIGHT_EAR = 7, 8
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Columns of the landmark array
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+LEFT, RIGHT = 0, 1
+# Ear, shoulder and hip for each body side, indexed by LEFT/RIGHT
+SIDE_LANDMARKS = np.array([
+    [LEFT_EAR, LEFT_SHOULDER, LEFT_HIP],
+    [RIGHT_EAR, RIGHT_SHOULDER, RIGHT_HIP],
+])
+UPPER_BODY_LANDMARKS = SIDE_LANDMARKS.ravel()
+_SIDE_TUPLES = tuple(tuple(int(index) for index in side) for side in SIDE_LANDMARKS)  # For scalar indexing
+
+class PoseLandmarks:
+    """Pose landmarks stored in a (33, 4) float32 array of normalized x, y, z and visibility."""
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        self.data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32) if data is None else data
+
+    def fill_from(self, landmark_list):
+        """Copy a MediaPipe landmark list into the preallocated array in one bulk assignment."""
+        count = len(landmark_list)
+        values = np.fromiter(
+            (value for landmark in landmark_list
+             for value in (landmark.x, landmark.y, landmark.z, landmark.visibility)),
+            dtype=np.float32, count=count * 4,
+        )
+        self.data[:count] = values.reshape(count, 4)
+        return self
+
+    def copy(self):
+        return PoseLandmarks(self.data.copy())
+
+    def pixel(self, index, width, height):
+        """Return the (x, y) pixel position of one landmark."""
+        return int(self.data[index, X] * width), int(self.data[index, Y] * height)
+
+    def _side_visibility(self, side):
+        visibility = self.data[:, VISIBILITY]
+        ear, shoulder, hip = _SIDE_TUPLES[side]
+        return float(visibility[ear]) + float(visibility[shoulder]) + float(visibility[hip])
+
+    def best_side(self):
+        """Return LEFT or RIGHT, whichever side's ear/shoulder/hip are more visible."""
+        return RIGHT if self._side_visibility(RIGHT) > self._side_visibility(LEFT) else LEFT
+
+    def visibility(self):
+        """Return the mean visibility of the ear, shoulder and hip on the more visible side."""
+        return max(self._side_visibility(LEFT), self._side_visibility(RIGHT)) / 3.0
+
+    def metrics(self, width, height):
+        """
+        Single-frame posture_metrics on plain floats, reading only the six landmarks it needs,
+        so no temporary arrays are created. Returns (angle, horizontal_distance, side).
+        """
+        side = self.best_side()
+        data = self.data
+        ear, shoulder, hip = (
+            (float(data[index, X]) * width, float(data[index, Y]) * height) for index in _SIDE_TUPLES[side]
+        )
+        return calculate_angle(ear, shoulder, hip), abs(ear[0] - shoulder[0]), side
+
+
+def posture_metrics(data, width, height):
+    """
+    Compute posture metrics for one frame or a batch of frames; PoseLandmarks.metrics is faster for one.
+    - data: Landmark array shaped (33, 4) or (frames, 33, 4).
+    - width, height: Frame size in pixels.
+    Returns (angle, horizontal_distance, side) arrays shaped like the leading dimensions of data,
+    each taken from the more visible body side.
+    """
+    points = data[..., SIDE_LANDMARKS, :]  # (..., side, ear/shoulder/hip, xyzv)
+    xy = points[..., :2] * np.array([width, height], dtype=np.float32)
+    angles = calculate_angles(xy[..., 0, :], xy[..., 1, :], xy[..., 2, :])  # (..., side)
+    distances = np.abs(xy[..., 0, 0] - xy[..., 1, 0])
+    side = np.argmax(points[..., VISIBILITY].sum(axis=-1), axis=-1)
+
+    side_index = np.expand_dims(side, -1)
+    angle = np.take_along_axis(angles, side_index, axis=-1)[..., 0]
+    horizontal_distance = np.take_along_axis(distances, side_index, axis=-1)[..., 0]
+    return angle, horizontal_distance, side
@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import re
+import socket
+import socketserver
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from components.profiling import StatsReporter
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+PREFIX = "posturefix_"
+
+STATUS_HELP = {
+    "present": "1 if somebody was detected in the latest frame.",
+    "angle": "Neck angle in the latest frame, in degrees.",
+    "horizontal_distance": "Horizontal ear-to-shoulder distance in the latest frame, in pixels.",
+}
+
+
+def parse_address(address):
+    """
+    Split a metrics address into (host, port) for TCP, or a path for a UNIX socket.
+    Accepts "host:port", a bare port (bound to 127.0.0.1) or "unix:/path/to.sock".
+    """
+    address = str(address)
+    if address.startswith("unix:"):
+        return address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _metric_name(name):
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_prometheus(snapshot):
+    """Render a stats snapshot in the Prometheus text exposition format."""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {_value(value)}" if labels else f"{name} {_value(value)}")
+
+    family(_metric_name("uptime_seconds"), "gauge", "Seconds since detection started.", [({}, snapshot["uptime_s"])])
+    family(_metric_name("frames_per_second"), "gauge", "Frames processed per second since the last snapshot.",
+           [({}, snapshot.get("fps"))])
+
+    status = snapshot.get("status", {})
+    if "posture" in status:
+        family(_metric_name("posture_bad"), "gauge", "1 while the debounced posture state is bad.",
+               [({}, status["posture"] == "bad")])
+    for name, help_text in STATUS_HELP.items():
+        if name in status:
+            family(_metric_name(name), "gauge", help_text, [({}, status[name])])
+    for name, value in status.get("window", {}).items():
+        if name != "frames":
+            family(_metric_name(f"window_{name}"), "gauge", f"Rolling {name.replace('_', ' ')} over recent frames.",
+                   [({}, value)])
+
+    for name, value in sorted(snapshot["counters"].items()):
+        if isinstance(value, str):
+            # Textual values, such as the duty cycle mode, become a label on a constant 1
+            family(_metric_name(name), "gauge", f"Current {name.replace('_', ' ')}.", [({name: value}, 1)])
+        else:
+            # Counters from increment() only grow, but set_counter() values may not, so they stay untyped
+            family(_metric_name(name), "untyped", f"Pipeline counter {name}.", [({}, value)])
+
+    stages = snapshot["stages"]
+    if stages:
+        latency = _metric_name("stage_latency_seconds")
+        family(latency, "summary", "Stage latency; quantiles over recent runs, sum and count over all runs.", [])
+        for stage, summary in stages.items():
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{latency}{{stage="{stage}",quantile="{quantile}"}} {_value(summary[key] / 1000.0)}')
+            lines.append(f'{latency}_sum{{stage="{stage}"}} {_value(summary["total_s"])}')
+            lines.append(f'{latency}_count{{stage="{stage}"}} {_value(summary["count"])}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        document = self.server.documents.get(self.path.split("?", 1)[0])
+        if document is None:
+            self.send_error(404, "Try /metrics or /status")
+            return
+        content_type, body = document
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer(StatsReporter):
+    def __init__(self, stats, address="127.0.0.1:9464", interval=1.0):
+        """
+        Serve pipeline stats and posture state over HTTP, on localhost or a UNIX socket.
+        GET /metrics returns the Prometheus text format and GET /status the same snapshot as JSON.
+        Both are rendered every interval on the reporter thread, so a scrape only sends bytes that
+        are already there and never waits on, or slows down, the detection loop.
+        - address: "host:port", a bare port, or "unix:/path/to.sock"; see parse_address.
+        """
+        super().__init__(stats, interval)
+        self.address = address
+        self._last_frames = None  # (time, frames_processed) of the last snapshot, for the fps
+        target = parse_address(address)
+        if isinstance(target, str):
+            if os.path.exists(target):
+                os.unlink(target)  # Left behind by an earlier run
+            self._server = _UnixHTTPServer(target, _MetricsHandler)
+        else:
+            self._server = ThreadingHTTPServer(target, _MetricsHandler)
+            self._server.daemon_threads = True
+        self._server.documents = {}
+        self.report(stats.snapshot())
+        self._server_thread = None
+
+    def start(self):
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name="metrics-server",
+                                               daemon=True)
+        self._server_thread.start()
+        return super().start()
+
+    def report(self, snapshot):
+        frames = snapshot["counters"].get("frames_processed", 0)
+        if self._last_frames is not None and snapshot["timestamp"] > self._last_frames[0]:
+            last_time, last_frames = self._last_frames
+            snapshot["fps"] = (frames - last_frames) / (snapshot["timestamp"] - last_time)
+        self._last_frames = (snapshot["timestamp"], frames)
+        # Swap in both documents at once; handlers only ever read this dict
+        self._server.documents = {
+            "/metrics": (PROMETHEUS_CONTENT_TYPE, format_prometheus(snapshot).encode("utf-8")),
+            "/status": (JSON_CONTENT_TYPE, json.dumps(snapshot, default=str).encode("utf-8")),
+        }
+
+    def stop(self):
+        super().stop()
+        self._server.shutdown()
+        self._server.server_close()
+        target = parse_address(self.address)
+        if isinstance(target, str) and os.path.exists(target):
+            os.unlink(target)
+
+
+def fetch_metrics(address, path="/metrics", timeout=2.0):
+    """Scrape a MetricsServer, over TCP or its UNIX socket, and return the response body as text."""
+    target = parse_address(address)
+    if not isinstance(target, str):
+        host, port = target
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=timeout) as response:
+            return response.read().decode("utf-8")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(target)
+        connection.sendall(f"GET {path} HTTP/1.0\r\nHost: localhost\r\n\r\n".encode("ascii"))
+        chunks = []
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    head, _, body = b"".join(chunks).partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].decode("ascii", "replace")
+    if status_line.split(" ")[1:2] != ["200"]:
+        raise OSError(f"Metrics request failed: {status_line}")
+    return body.decode("utf-8")
@@ -0,0 +1,42 @@
+import cv2
+import time
+
+class MotionGate:
+    def __init__(self, size=(64, 48), threshold=3.0, max_stale_seconds=2.0):
+        """
+        Decide whether a frame differs enough from the last inferred one to rerun the pose model.
+        - size: Resolution of the grayscale thumbnail used for comparison.
+        - threshold: Mean absolute gray-level difference (0-255) that counts as motion.
+        - max_stale_seconds: Rerun the model at least this often, even without motion.
+        """
+        self.size = size
+        self.threshold = threshold
+        self.max_stale_seconds = max_stale_seconds
+        self._small = None  # Reused downscale buffer
+        self._gray = None  # Thumbnail of the current frame
+        self._reference = None  # Thumbnail of the frame the model last ran on
+        self._diff = None
+        self._last_inference_time = None
+        self.last_change = None  # Most recent difference score, for diagnostics
+
+    def should_infer(self, frame, now=None):
+        """Return True if the pose model should run on this frame."""
+        if now is None:
+            now = time.monotonic()
+        self._small = cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is not None and now - self._last_inference_time < self.max_stale_seconds:
+            self._diff = cv2.absdiff(self._gray, self._reference, dst=self._diff)
+            self.last_change = cv2.mean(self._diff)[0]
+            if self.last_change < self.threshold:
+                return False
+
+        # Compare future frames against this one so slow drift still adds up to a rerun
+        self._gray, self._reference = self._reference, self._gray
+        self._last_inference_time = now
+        return True
+
+    def reset(self):
+        """Force the next frame to be inferred."""
+        self._reference = None
@@ -0,0 +1,261 @@
+import multiprocessing
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from components.landmarks import PoseLandmarks
+from components.pipeline import FrameResult
+from components.profiling import PipelineStats
+
+# Picklable description of a SharedFrameRing, used to attach to it from another process
+RingSpec = namedtuple("RingSpec", ["name", "slots", "shape", "dtype"])
+
+class SharedFrameRing:
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        """
+        Fixed-size frame slots in one shared memory block. Processes exchange slot
+        indices instead of frames, so frames are never pickled or copied between them.
+        - name: Attach to an existing block instead of creating one.
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def spec(self):
+        return RingSpec(self.shm.name, self.slots, self.shape, self.dtype.str)
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec.slots, spec.shape, spec.dtype, name=spec.name)
+
+    def frame(self, slot):
+        """Return a view of one slot."""
+        return self.frames[slot]
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+MAX_READ_FAILURES = 50  # Consecutive failed reads before the source counts as finished
+CAPTURE, INFERENCE = 0, 1  # Entries of MultiprocessPipeline.cpu_times
+
+
+def capture_process(spec, source, fps, free_slots, frame_queue, stop_event, cpu_times=None):
+    """
+    Read frames from the camera straight into free ring slots and announce them by index.
+    - fps: multiprocessing.Value holding the publish rate; it can change while running.
+    - cpu_times: Shared array whose CAPTURE entry is kept at this process's CPU time.
+    """
+    import cv2
+    ring = SharedFrameRing.attach(spec)
+    height, width = ring.shape[:2]
+    cap = cv2.VideoCapture(source)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    last_publish = 0.0
+    sequence = 0
+    failures = 0
+    try:
+        while not stop_event.is_set() and cap.isOpened() and failures < MAX_READ_FAILURES:
+            if cpu_times is not None:
+                cpu_times[CAPTURE] = time.process_time()
+            now = time.monotonic()
+            try:
+                # Measured from the last frame, so a rate change applies immediately
+                slot = free_slots.get_nowait() if now >= last_publish + 1.0 / fps.value else None
+            except queue.Empty:
+                slot = None
+            if slot is None:
+                # Not due yet, or every slot is in use: keep the device drained without decoding
+                if cap.grab():
+                    failures = 0
+                else:
+                    failures += 1
+                    time.sleep(0.01)
+                continue
+
+            target = ring.frame(slot)
+            ret, frame = cap.read(target)
+            if not ret:
+                free_slots.put(slot)
+                failures += 1
+                time.sleep(0.01)
+                continue
+            failures = 0
+            if frame is not target:  # The device ignored the requested size
+                target[:] = cv2.resize(frame, (width, height))
+            sequence += 1
+            last_publish = now
+            frame_queue.put((slot, sequence, time.monotonic()))
+    finally:
+        cap.release()
+        ring.close()
+        frame_queue.put(None)
+
+
+def inference_process(spec, detector_options, motion_gate_options, frame_queue, result_queue, free_slots, stop_event,
+                      tracker_options=None, cpu_times=None):
+    """
+    Run pose inference on the newest announced slot, returning stale slots unprocessed.
+    - cpu_times: Shared array whose INFERENCE entry is kept at this process's CPU time.
+    """
+    from components.keypoint_tracker import KeypointTracker
+    from components.motion_gate import MotionGate
+    from components.pose_detection import PoseDetector
+    ring = SharedFrameRing.attach(spec)
+    pose_detector = PoseDetector(**detector_options)
+    pose_detector.warm_up(ring.shape[1], ring.shape[0])  # While the capture process opens the camera
+    motion_gate = MotionGate(**motion_gate_options) if motion_gate_options is not None else None
+    tracker = KeypointTracker(**tracker_options) if tracker_options is not None else None
+    last_data = last_metrics = None
+    try:
+        while not stop_event.is_set():
+            if cpu_times is not None:
+                cpu_times[INFERENCE] = time.process_time()
+            try:
+                item = frame_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Skip to the newest frame so inference never works on a backlog
+            stale = 0
+            while item is not None:
+                try:
+                    newer = frame_queue.get_nowait()
+                except queue.Empty:
+                    break
+                free_slots.put(item[0])
+                stale += 1
+                item = newer
+            if item is None:
+                break
+
+            slot, sequence, timestamp = item
+            frame = ring.frame(slot)
+            started = time.perf_counter()
+            inferred = motion_gate is None or motion_gate.should_infer(frame)
+            tracked = tracker.track(frame) if inferred and tracker is not None else None
+            if tracked is not None:
+                inferred = False  # Optical flow moved the last landmarks; the model didn't run
+                last_data = tracked.data.copy()
+                last_metrics = pose_detector.calculate_metrics(tracked, frame)
+            elif inferred:
+                landmarks = pose_detector.get_pose_landmarks(frame)
+                last_data = landmarks.data.copy() if landmarks else None
+                last_metrics = pose_detector.calculate_metrics(landmarks, frame) if landmarks else None
+                if tracker is not None:
+                    if landmarks:
+                        tracker.start(frame, landmarks)
+                    else:
+                        tracker.reset()
+            latency = time.perf_counter() - started
+            # Ownership of the slot passes to the presenter along with the result
+            result_queue.put((slot, sequence, timestamp, last_data, last_metrics, inferred, latency, stale))
+    finally:
+        ring.close()
+        result_queue.put(None)
+
+
+class MultiprocessPipeline:
+    def __init__(self, width=640, height=480, fps=10, source=0, slots=4, detector_options=None,
+                 motion_gate_options=None, stats=None, tracker_options=None):
+        """
+        Capture and inference in separate processes, sharing frames through a SharedFrameRing.
+        The calling process presents results and must release() each one to recycle its slot.
+        - slots: Number of frame slots; at least 3 (capture, inference and presenter each hold one).
+        - detector_options: Keyword arguments for PoseDetector in the inference process.
+        - motion_gate_options: Keyword arguments for a MotionGate in the inference process, or None.
+        - tracker_options: Keyword arguments for a KeypointTracker in the inference process, or None.
+        """
+        self.stats = stats or PipelineStats(enabled=False)
+        self.ring = SharedFrameRing(max(slots, 3), (height, width, 3))
+        self.free_slots = multiprocessing.Queue()
+        for slot in range(self.ring.slots):
+            self.free_slots.put(slot)
+        self.frame_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.fps = multiprocessing.Value("d", fps, lock=False)  # Read by the capture process each frame
+        # CPU seconds used by each child, published by the children themselves: os.times() and
+        # getrusage(RUSAGE_CHILDREN) only count children that have already exited
+        self.cpu_times = multiprocessing.Array("d", 2, lock=False)
+        self.dropped_frames = 0
+        self._last_sequence = 0
+        self._running = True
+
+        self.processes = [
+            multiprocessing.Process(
+                target=capture_process, name="posture-capture", daemon=True,
+                args=(self.ring.spec, source, self.fps, self.free_slots, self.frame_queue, self.stop_event,
+                      self.cpu_times),
+            ),
+            multiprocessing.Process(
+                target=inference_process, name="posture-inference", daemon=True,
+                args=(self.ring.spec, detector_options or {}, motion_gate_options, self.frame_queue,
+                      self.result_queue, self.free_slots, self.stop_event, tracker_options, self.cpu_times),
+            ),
+        ]
+        for process in self.processes:
+            process.start()
+
+    def is_running(self):
+        return self._running
+
+    def set_fps(self, fps):
+        """Change the capture and inference rate."""
+        self.fps.value = fps
+
+    def cpu_time(self):
+        """CPU seconds used so far by this process and the capture and inference processes."""
+        return time.process_time() + sum(self.cpu_times)
+
+    def next_result(self, timeout=1.0):
+        """Return the next FrameResult in capture order, or None if none arrived in time."""
+        with self.stats.stage("capture"):
+            try:
+                item = self.result_queue.get(timeout=timeout)
+            except queue.Empty:
+                return None
+        if item is None:
+            self._running = False
+            return None
+
+        slot, sequence, timestamp, data, metrics, inferred, latency, stale = item
+        self.dropped_frames += stale
+        self.stats.set_counter("frames_dropped", self.dropped_frames)
+        if sequence <= self._last_sequence:  # Never present frames out of order
+            self.free_slots.put(slot)
+            return None
+        self._last_sequence = sequence
+        if inferred:
+            self.stats.record("inference", latency)
+        else:
+            self.stats.increment("inferences_skipped")
+        landmarks = PoseLandmarks(data) if data is not None else None
+        return FrameResult(self.ring.frame(slot), timestamp, landmarks, metrics, inferred, slot)
+
+    def release(self, result):
+        """Return a presented frame's slot to the capture process."""
+        self.free_slots.put(result.handle)
+
+    def close(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._running = False
+        self.ring.close()
@@ -0,0 +1,88 @@
+import time
+from collections import namedtuple
+
+from components.profiling import PipelineStats
+
+# One processed frame handed to the evaluation/presentation side of the loop
+FrameResult = namedtuple("FrameResult", ["frame", "timestamp", "landmarks", "metrics", "inferred", "handle"])
+
+class LocalPipeline:
+    def __init__(self, camera, pose_detector, motion_gate=None, stats=None, tracker=None):
+        """
+        Capture and pose inference on the calling thread.
+        - camera: Camera to read frames from.
+        - motion_gate: Optional MotionGate; when it reports no motion the last result is reused.
+        - tracker: Optional KeypointTracker; between pose inferences it moves the last landmarks
+          with optical flow, and the model only runs when tracking gives up.
+        """
+        self.camera = camera
+        self.pose_detector = pose_detector
+        self.motion_gate = motion_gate
+        self.tracker = tracker
+        self.stats = stats or PipelineStats(enabled=False)
+        self._last_landmarks = None  # Landmarks and metrics from the last frame the model ran on
+        self._last_metrics = None
+
+    def is_running(self):
+        return self.camera.is_opened()
+
+    def set_fps(self, fps):
+        """Change the capture and inference rate."""
+        self.camera.set_fps(fps)
+
+    def cpu_time(self):
+        """CPU seconds used by the pipeline so far; everything runs in this process."""
+        return time.process_time()
+
+    def next_result(self):
+        """Return the next FrameResult, or None if no frame was available."""
+        stats = self.stats
+        # Waiting for the next frame to be due is not capture work; keep it out of that stage
+        with stats.stage("idle"):
+            self.camera.pace()
+        with stats.stage("capture"):
+            frame = self.camera.get_frame()
+        if frame is None:
+            return None
+        timestamp = time.monotonic()
+
+        # Get pose landmarks and calculate metrics, reusing the last result while nothing moves
+        with stats.stage("motion_gate"):
+            run_inference = self.motion_gate is None or self.motion_gate.should_infer(frame)
+        if run_inference and self.tracker is not None:
+            with stats.stage("tracking"):
+                tracked = self.tracker.track(frame)
+            if tracked is not None:
+                with stats.stage("metrics"):
+                    self._last_metrics = self.pose_detector.calculate_metrics(tracked, frame)
+                self._last_landmarks = tracked
+                stats.increment("frames_tracked")
+                stats.set_counter("frames_dropped", self.camera.dropped_frames)
+                return FrameResult(frame, timestamp, tracked, self._last_metrics, False, None)
+
+        if run_inference:
+            with stats.stage("cvtColor"):
+                image = self.pose_detector.to_rgb(frame)
+            with stats.stage("inference"):
+                landmarks = self.pose_detector.detect(image)
+            self._last_landmarks = landmarks
+            self._last_metrics = None
+            if self.tracker is not None:
+                if landmarks:
+                    self.tracker.start(frame, landmarks)
+                else:
+                    self.tracker.reset()
+            if landmarks:
+                with stats.stage("metrics"):
+                    self._last_metrics = self.pose_detector.calculate_metrics(landmarks, frame)
+        else:
+            stats.increment("inferences_skipped")
+        stats.set_counter("frames_dropped", self.camera.dropped_frames)
+        return FrameResult(frame, timestamp, self._last_landmarks, self._last_metrics, run_inference, None)
+
+    def release(self, result):
+        """Hand a result's frame back to the pipeline once the caller is done with it."""
+        self.camera.release_frame(result.frame)
+
+    def close(self):
+        self.camera.release()
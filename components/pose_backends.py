@@ -0,0 +1,398 @@
+import importlib.util
+import json
+import os
+import platform
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+from components.landmarks import (
+    PoseLandmarks, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, X, Y, VISIBILITY,
+)
+
+# Photo of a seated person (NASA portrait of Eileen Collins, public domain) used when no camera
+# frame is at hand. The pose models only run their landmark stage when somebody is in view, so
+# timing them on an empty frame would make every model variant look equally fast.
+SAMPLE_IMAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets",
+                            "benchmark_person.jpg")
+
+# Bumped whenever the benchmark itself changes, so selections cached by older versions are redone
+SELECTION_VERSION = 2
+
+# MediaPipe landmark indices filled from MoveNet's 17 COCO keypoints
+COCO_TO_MEDIAPIPE = {
+    0: 0,  # Nose
+    3: LEFT_EAR,
+    4: RIGHT_EAR,
+    5: LEFT_SHOULDER,
+    6: RIGHT_SHOULDER,
+    11: LEFT_HIP,
+    12: RIGHT_HIP,
+}
+
+class PoseBackend(ABC):
+    """Runs one pose model on RGB images and writes the result into a PoseLandmarks."""
+    name = None
+    asynchronous = False  # True if process() may return the result of an earlier image
+
+    @abstractmethod
+    def process(self, image, landmarks):
+        """
+        Run the model on an RGB image.
+        - landmarks: PoseLandmarks to fill with normalized coordinates.
+        Returns True if a person was found.
+        """
+
+    def warm_up(self, width=640, height=480):
+        """Run one inference on the sample image so the first real frame doesn't pay for initialization."""
+        self.process(load_sample_image(width, height), PoseLandmarks())
+
+    def close(self):
+        pass
+
+
+class MediaPipePoseBackend(PoseBackend):
+    name = "mediapipe"
+
+    def __init__(self, model_complexity=1, static_image_mode=False, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        """MediaPipe's Pose solution; model_complexity is 0 (lite), 1 (full) or 2 (heavy)."""
+        import mediapipe as mp  # Imported on first use; it is the slowest module to load
+        self.pose = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+
+    def process(self, image, landmarks):
+        results = self.pose.process(image)
+        if not results.pose_landmarks:
+            return False
+        landmarks.fill_from(results.pose_landmarks.landmark)
+        return True
+
+    def warm_up(self, width=640, height=480):
+        super().warm_up(width, height)
+        self.pose.reset()  # Otherwise the first real frame is tracked from the person in the sample image
+
+    def close(self):
+        self.pose.close()
+
+
+class PoseLandmarkerBackend(PoseBackend):
+    name = "landmarker"
+
+    def __init__(self, model_path, running_mode="live_stream", min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        """
+        MediaPipe Tasks PoseLandmarker, loaded from a pose_landmarker_*.task model file.
+        - running_mode: "live_stream" hands images to the model asynchronously and returns the
+          newest finished result, so inference never blocks the caller; "video" runs synchronously
+          with tracking; "image" treats every image as unrelated.
+        """
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+
+        self._mp = mp
+        self.running_mode = running_mode
+        self.asynchronous = running_mode == "live_stream"
+        modes = {
+            "live_stream": vision.RunningMode.LIVE_STREAM,
+            "video": vision.RunningMode.VIDEO,
+            "image": vision.RunningMode.IMAGE,
+        }
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=modes[running_mode],
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if self.asynchronous else None,
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self._last_timestamp_ms = 0
+        self._latest = None  # (33, 4) array from the newest asynchronous result, None if nobody was found
+        self._latest_timestamp_ms = 0  # Timestamp of the image _latest came from
+        self._discard_until_ms = 0  # Results for images up to this timestamp are warm-up results
+        self._lock = threading.Lock()
+        self._result_ready = threading.Condition(self._lock)
+
+    def _timestamp_ms(self):
+        # The Tasks API rejects timestamps that don't increase
+        self._last_timestamp_ms = max(self._last_timestamp_ms + 1, int(time.monotonic() * 1000))
+        return self._last_timestamp_ms
+
+    @staticmethod
+    def _to_array(result):
+        if not result.pose_landmarks:
+            return None
+        return np.array(
+            [(point.x, point.y, point.z, point.visibility) for point in result.pose_landmarks[0]],
+            dtype=np.float32,
+        )
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Tasks callback, run on MediaPipe's thread."""
+        data = self._to_array(result) if timestamp_ms > self._discard_until_ms else None
+        with self._result_ready:
+            self._latest = data
+            self._latest_timestamp_ms = timestamp_ms
+            self._result_ready.notify_all()
+
+    def process(self, image, landmarks):
+        mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=image)
+        if self.running_mode == "live_stream":
+            self.landmarker.detect_async(mp_image, self._timestamp_ms())
+            with self._lock:
+                data = self._latest
+        elif self.running_mode == "video":
+            data = self._to_array(self.landmarker.detect_for_video(mp_image, self._timestamp_ms()))
+        else:
+            data = self._to_array(self.landmarker.detect(mp_image))
+        if data is None:
+            return False
+        np.copyto(landmarks.data, data)
+        return True
+
+    def warm_up(self, width=640, height=480, timeout=5.0):
+        super().warm_up(width, height)
+        if self.asynchronous:
+            # Wait for the sample image's result, then drop it so it is never returned for a camera frame
+            self._discard_until_ms = self._last_timestamp_ms
+            with self._result_ready:
+                self._result_ready.wait_for(lambda: self._latest_timestamp_ms >= self._last_timestamp_ms, timeout)
+                self._latest = None
+
+    def close(self):
+        self.landmarker.close()
+
+
+class MoveNetBackend(PoseBackend):
+    name = "movenet"
+
+    def __init__(self, model_path, min_detection_confidence=0.3, num_threads=None):
+        """
+        MoveNet single-pose keypoint model, run with ONNX Runtime (.onnx) or TFLite (.tflite).
+        Only the nose, ears, shoulders and hips are filled in; other landmarks stay invisible.
+        """
+        self.min_detection_confidence = min_detection_confidence
+        if model_path.endswith(".onnx"):
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            if num_threads:
+                session_options.intra_op_num_threads = num_threads
+            self.session = onnxruntime.InferenceSession(
+                model_path, session_options, providers=["CPUExecutionProvider"]
+            )
+            model_input = self.session.get_inputs()[0]
+            self._input_name = model_input.name
+            shape = model_input.shape
+            dtype = np.int32 if model_input.type == "tensor(int32)" else np.float32
+            self._run = lambda tensor: self.session.run(None, {self._input_name: tensor})[0]
+        else:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                from tensorflow.lite import Interpreter
+            self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+            self.interpreter.allocate_tensors()
+            input_details = self.interpreter.get_input_details()[0]
+            output_index = self.interpreter.get_output_details()[0]["index"]
+            shape = input_details["shape"]
+            dtype = input_details["dtype"]
+
+            def run(tensor):
+                self.interpreter.set_tensor(input_details["index"], tensor)
+                self.interpreter.invoke()
+                return self.interpreter.get_tensor(output_index)
+            self._run = run
+
+        # MoveNet takes one NHWC image, typically 192x192 (Lightning) or 256x256 (Thunder)
+        self._size = (int(shape[2]), int(shape[1]))
+        self._resized = np.empty((self._size[1], self._size[0], 3), dtype=np.uint8)
+        self._tensor = np.empty((1, self._size[1], self._size[0], 3), dtype=dtype)
+        self._coco = np.array(list(COCO_TO_MEDIAPIPE.keys()))
+        self._mediapipe = np.array(list(COCO_TO_MEDIAPIPE.values()))
+
+    def process(self, image, landmarks):
+        # The image is stretched to the square input; normalized coordinates map straight back
+        cv2.resize(image, self._size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        np.copyto(self._tensor[0], self._resized, casting="unsafe")
+        keypoints = self._run(self._tensor).reshape(-1, 3)[self._coco]  # (y, x, score) rows
+        if keypoints[1:, 2].max() < self.min_detection_confidence:
+            return False
+        data = landmarks.data
+        data[self._mediapipe, X] = keypoints[:, 1]
+        data[self._mediapipe, Y] = keypoints[:, 0]
+        data[self._mediapipe, VISIBILITY] = keypoints[:, 2]
+        return True
+
+
+BACKENDS = {
+    MediaPipePoseBackend.name: MediaPipePoseBackend,
+    PoseLandmarkerBackend.name: PoseLandmarkerBackend,
+    MoveNetBackend.name: MoveNetBackend,
+}
+
+
+def create_backend(name="mediapipe", model_complexity=1, static_image_mode=False, min_detection_confidence=0.5,
+                   min_tracking_confidence=0.5, **options):
+    """
+    Create a PoseBackend by name, translating the common PoseDetector options for it.
+    - options: Backend-specific keyword arguments, such as model_path.
+    """
+    if name == MediaPipePoseBackend.name:
+        return MediaPipePoseBackend(model_complexity, static_image_mode, min_detection_confidence,
+                                    min_tracking_confidence)
+    if name == PoseLandmarkerBackend.name:
+        if static_image_mode:
+            options["running_mode"] = "image"
+        return PoseLandmarkerBackend(min_detection_confidence=min_detection_confidence,
+                                     min_tracking_confidence=min_tracking_confidence, **options)
+    if name == MoveNetBackend.name:
+        return MoveNetBackend(**options)
+    raise ValueError(f"Unknown pose backend: {name}")
+
+
+def _installed(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+def load_sample_image(width=640, height=480):
+    """
+    Return SAMPLE_IMAGE as an RGB array of the given size, or a blank frame if the file is missing.
+    A blank frame only initializes the person detector, not the landmark model.
+    """
+    image = cv2.imread(SAMPLE_IMAGE)
+    if image is None:
+        print(f"Sample image {SAMPLE_IMAGE} not found; using a blank frame")
+        return np.zeros((height, width, 3), dtype=np.uint8)
+    if image.shape[:2] != (height, width):
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def backend_candidates(models_dir="models"):
+    """
+    Return (label, backend name, options) for every backend usable on this host, most accurate first.
+    PoseLandmarker and MoveNet are only offered when their model files are in models_dir.
+    """
+    candidates = []
+    has_mediapipe = _installed("mediapipe")
+    for variant, complexity in (("heavy", 2), ("full", 1), ("lite", 0)):
+        model_path = os.path.join(models_dir, f"pose_landmarker_{variant}.task")
+        if has_mediapipe and os.path.exists(model_path):
+            candidates.append((f"landmarker-{variant}", "landmarker", {"model_path": model_path}))
+        if has_mediapipe:
+            candidates.append((f"mediapipe-{complexity}", "mediapipe", {"model_complexity": complexity}))
+    for variant in ("thunder", "lightning"):
+        for extension, runtime in ((".onnx", "onnxruntime"), (".tflite", "tflite_runtime"), (".tflite", "tensorflow")):
+            model_path = os.path.join(models_dir, f"movenet_{variant}{extension}")
+            if os.path.exists(model_path) and _installed(runtime):
+                candidates.append((f"movenet-{variant}", "movenet", {"model_path": model_path}))
+                break
+    return candidates
+
+
+def benchmark_backend(name, options, image, frames=20):
+    """
+    Time a backend on an RGB image, which should show a person, after one warm-up run.
+    Returns (per-frame latencies in seconds, whether a person was found).
+    """
+    options = dict(options)
+    if name == PoseLandmarkerBackend.name:
+        options["running_mode"] = "video"  # Synchronous, so the full inference time is measured
+    backend = create_backend(name, **options)
+    landmarks = PoseLandmarks()
+    try:
+        found = backend.process(image, landmarks)
+        latencies = np.empty(frames)
+        for index in range(frames):
+            started = time.perf_counter()
+            backend.process(image, landmarks)
+            latencies[index] = time.perf_counter() - started
+        return latencies, found
+    finally:
+        backend.close()
+
+
+def host_id():
+    """Identify this machine's CPU for caching benchmark results."""
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}|{os.cpu_count()}"
+
+
+def select_backend(budget_ms=50, models_dir="models", image=None, frames=20, cache_path="backend_selection.json"):
+    """
+    Pick the most accurate backend whose 95th percentile latency fits the per-frame budget.
+    Candidates are benchmarked from most to least accurate and the first that fits wins;
+    if none does, the fastest is used. The choice is cached per host, budget and candidate list.
+    - image: RGB image of a person to benchmark on, or a function returning one (or None), which
+      is only called when a benchmark is needed, e.g. to grab a camera frame. SAMPLE_IMAGE is
+      used otherwise. A choice is only cached if every backend found a person in the image.
+    Returns (label, backend name, options).
+    """
+    candidates = backend_candidates(models_dir)
+    if not candidates:
+        raise RuntimeError("No pose backend is available; install mediapipe")
+    cache_key = f"v{SELECTION_VERSION}|{host_id()}|{budget_ms}|{','.join(label for label, _, _ in candidates)}"
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as file:
+                cache = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading backend selection cache: {e}")
+    # Entries without the version prefix were measured on a blank frame; drop them
+    cache = {key: label for key, label in cache.items() if key.startswith(f"v{SELECTION_VERSION}|")}
+    for label, name, options in candidates:
+        if cache.get(cache_key) == label:
+            return label, name, options
+
+    if callable(image):
+        image = image()
+    if image is None:
+        image = load_sample_image()
+    print(f"Benchmarking pose backends against a {budget_ms} ms budget")
+    fastest = None
+    chosen = None
+    reliable = True  # Whether every timing included the landmark model
+    for label, name, options in candidates:
+        try:
+            latencies, found = benchmark_backend(name, options, image, frames)
+        except Exception as e:
+            print(f"  {label}: unavailable ({e})")
+            continue
+        p95_ms = float(np.percentile(latencies, 95) * 1000.0)
+        print(f"  {label}: p95 {p95_ms:.1f} ms" + ("" if found else " (nobody found, so too optimistic)"))
+        reliable = reliable and bool(found)
+        if fastest is None or p95_ms < fastest[0]:
+            fastest = (p95_ms, (label, name, options))
+        if p95_ms <= budget_ms:
+            chosen = (label, name, options)
+            break
+    if chosen is None:
+        if fastest is None:
+            raise RuntimeError("No pose backend could be loaded")
+        chosen = fastest[1]
+        print(f"No backend fits the budget; using the fastest, {chosen[0]}")
+    else:
+        print(f"Using pose backend {chosen[0]}")
+
+    if cache_path and not reliable:
+        print("Not caching the backend choice; it will be measured again next time")
+    elif cache_path:
+        cache[cache_key] = chosen[0]
+        try:
+            with open(cache_path, "w") as file:
+                json.dump(cache, file, indent=2)
+        except OSError as e:
+            print(f"Error saving backend selection cache: {e}")
+    return chosen
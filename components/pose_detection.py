@@ -1,48 +1,159 @@
-import mediapipe as mp
 import cv2
-from components.utils import calculate_angle
+from components.landmarks import (
+    PoseLandmarks, SIDE_LANDMARKS, UPPER_BODY_LANDMARKS, X, Y, Z, VISIBILITY,
+)
+from components.buffer_pool import FramePool
+from components.pose_backends import create_backend
 
 class PoseDetector:
-    def __init__(self):
-        self.pose = mp.solutions.pose.Pose(static_image_mode=False, min_detection_confidence=0.5)
+    def __init__(self, model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 roi=False, roi_margin=0.3, inference_size=256, roi_min_visibility=0.5, static_image_mode=False,
+                 backend="mediapipe", backend_options=None, pool=None):
+        """
+        Initialize the pose model.
+        - model_complexity: 0 (lite), 1 (full) or 2 (heavy), for the MediaPipe Pose backend.
+        - roi: If True, crop each frame around the previous frame's upper-body landmarks.
+        - roi_margin: Margin added around the landmark box, as a fraction of its larger side.
+        - inference_size: Longest side (px) the crop is downsized to before inference.
+        - roi_min_visibility: Landmarks below this visibility are ignored when building the ROI.
+        - static_image_mode: Treat every image as unrelated, e.g. when one detector serves several streams.
+        - backend: Name of the PoseBackend to run, see components.pose_backends.
+        - backend_options: Extra keyword arguments for the backend, such as model_path.
+        - pool: FramePool for full-frame RGB conversions, typically shared with the Camera.
+        """
+        self.backend = create_backend(
+            backend, model_complexity, static_image_mode, min_detection_confidence, min_tracking_confidence,
+            **(backend_options or {})
+        )
+        if roi and self.backend.asynchronous:
+            # Results arrive a frame late, so they can't be mapped back through the current crop
+            print("ROI cropping is not supported with an asynchronous pose backend; using full frames")
+            roi = False
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.inference_size = inference_size
+        self.roi_min_visibility = roi_min_visibility
+        self._roi_box = None  # (x0, y0, x1, y1) in normalized coordinates, from the last detection
+        self._crop_box = None  # Box applied to the image currently being processed
+        self._source_frame = None  # Full frame kept for falling back when the ROI loses the user
+        self.landmarks = PoseLandmarks()  # Reused for every detection
+        self.pool = pool if pool is not None else FramePool(count=1)
+        self._rgb = None  # Pooled full-frame RGB buffer, owned from to_rgb() until detect() returns
+        self._small = None  # Reused buffers for the ROI crop, whose size varies
+        self._crop_rgb = None
+
+    def warm_up(self, width=640, height=480):
+        """
+        Run one inference on the sample image so the first real frame doesn't pay for
+        initializing the model graph. The backend then forgets the person it found there,
+        so the first real frame is detected from scratch.
+        """
+        self.backend.warm_up(width, height)
+        self._roi_box = None
 
     def get_pose_landmarks(self, frame):
         """Detect pose landmarks in the given frame."""
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(image)
-        return results.pose_landmarks.landmark if results.pose_landmarks else None
+        image = self.to_rgb(frame)
+        return self.detect(image)
+
+    def _full_frame_rgb(self, frame):
+        """Convert a whole frame into a pooled buffer."""
+        if self._rgb is None:
+            self._rgb = self.pool.acquire()
+        self._rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def to_rgb(self, frame):
+        """Convert a BGR camera frame to the RGB layout MediaPipe expects, cropped to the ROI if tracking."""
+        self._crop_box = None
+        if not self.roi or self._roi_box is None:
+            return self._full_frame_rgb(frame)
+
+        self._source_frame = frame
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self._roi_box
+        left, top = int(x0 * width), int(y0 * height)
+        right, bottom = int(x1 * width), int(y1 * height)
+        crop = frame[top:bottom, left:right]
+        self._crop_box = (left / width, top / height, (right - left) / width, (bottom - top) / height)
+
+        scale = self.inference_size / max(crop.shape[0], crop.shape[1])
+        if scale < 1.0:
+            crop = self._small = cv2.resize(crop, None, dst=self._small, fx=scale, fy=scale,
+                                            interpolation=cv2.INTER_AREA)
+        self._crop_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._crop_rgb)
+        return self._crop_rgb
+
+    def detect(self, image):
+        """
+        Run pose inference on an RGB image and return PoseLandmarks normalized to the full frame.
+        The returned object is reused by the next call; copy() it to keep it.
+        """
+        landmarks = self.landmarks
+        found = self.backend.process(image, landmarks)
+
+        if self._crop_box is not None and not found:
+            # Tracking lost inside the crop; retry on the whole frame
+            self._roi_box = None
+            self._crop_box = None
+            found = self.backend.process(self._full_frame_rgb(self._source_frame), landmarks)
+        self._source_frame = None
+        # The backend is done with the image, so the buffer goes back to the pool
+        self.pool.release(self._rgb)
+        self._rgb = None
+
+        if not found:
+            self._roi_box = None
+            return None
+
+        if self._crop_box is not None:
+            self._map_to_frame(landmarks)
+        if self.roi:
+            self._roi_box = self._compute_roi(landmarks)
+        return landmarks
+
+    def _map_to_frame(self, landmarks):
+        """Convert landmarks from crop-normalized to frame-normalized coordinates, in place."""
+        left, top, crop_width, crop_height = self._crop_box
+        data = landmarks.data
+        data[:, X] *= crop_width
+        data[:, X] += left
+        data[:, Y] *= crop_height
+        data[:, Y] += top
+        data[:, Z] *= crop_width
+
+    def _compute_roi(self, landmarks):
+        """Return a normalized box around the visible ear/shoulder/hip landmarks plus margin."""
+        points = landmarks.data[UPPER_BODY_LANDMARKS]
+        points = points[points[:, VISIBILITY] >= self.roi_min_visibility]
+        if len(points) < 3:
+            return None
+        x0, y0 = points[:, X].min(), points[:, Y].min()
+        x1, y1 = points[:, X].max(), points[:, Y].max()
+        margin = self.roi_margin * max(x1 - x0, y1 - y0)
+        x0, y0 = max(0.0, x0 - margin), max(0.0, y0 - margin)
+        x1, y1 = min(1.0, x1 + margin), min(1.0, y1 + margin)
+        if x1 - x0 < 0.05 or y1 - y0 < 0.05:
+            return None
+        return (float(x0), float(y0), float(x1), float(y1))
 
     def calculate_metrics(self, landmarks, frame):
-        """Calculate angle and horizontal distance for posture analysis."""
-        ear = [landmarks[mp.solutions.pose.PoseLandmark.LEFT_EAR.value].x * frame.shape[1],
-               landmarks[mp.solutions.pose.PoseLandmark.LEFT_EAR.value].y * frame.shape[0]]
-        shoulder = [landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER.value].x * frame.shape[1],
-                    landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER.value].y * frame.shape[0]]
-        hip = [landmarks[mp.solutions.pose.PoseLandmark.LEFT_HIP.value].x * frame.shape[1],
-               landmarks[mp.solutions.pose.PoseLandmark.LEFT_HIP.value].y * frame.shape[0]]
-
-        angle = calculate_angle(ear, shoulder, hip)
-        horizontal_distance = abs(ear[0] - shoulder[0])
+        """Calculate angle and horizontal distance for posture analysis, using the more visible side."""
+        angle, horizontal_distance, _ = landmarks.metrics(frame.shape[1], frame.shape[0])
         return angle, horizontal_distance
 
-    def visualize_pose(self, frame, landmarks):
-        """Visualize pose landmarks and lines."""
-        mp_pose = mp.solutions.pose
-
-        try:
-            ear = [int(landmarks[mp_pose.PoseLandmark.LEFT_EAR.value].x * frame.shape[1]),
-                   int(landmarks[mp_pose.PoseLandmark.LEFT_EAR.value].y * frame.shape[0])]
-            shoulder = [int(landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x * frame.shape[1]),
-                        int(landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y * frame.shape[0])]
-            hip = [int(landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x * frame.shape[1]),
-                   int(landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y * frame.shape[0])]
-
-            # Draw points and lines
-            cv2.circle(frame, ear, 5, (255, 0, 0), -1)
-            cv2.circle(frame, shoulder, 5, (0, 255, 0), -1)
-            cv2.circle(frame, hip, 5, (0, 0, 255), -1)
-            cv2.line(frame, ear, shoulder, (255, 0, 0), 2)
-            cv2.line(frame, shoulder, hip, (0, 255, 0), 2)
-
-        except IndexError:
-            print("Landmarks not detected properly for visualization.")
+    @staticmethod
+    def visualize_pose(frame, landmarks):
+        """Visualize pose landmarks and lines for the side used by the metrics."""
+        height, width = frame.shape[:2]
+        ear_index, shoulder_index, hip_index = SIDE_LANDMARKS[landmarks.best_side()]
+        ear = landmarks.pixel(ear_index, width, height)
+        shoulder = landmarks.pixel(shoulder_index, width, height)
+        hip = landmarks.pixel(hip_index, width, height)
+
+        # Draw points and lines
+        cv2.circle(frame, ear, 5, (255, 0, 0), -1)
+        cv2.circle(frame, shoulder, 5, (0, 255, 0), -1)
+        cv2.circle(frame, hip, 5, (0, 0, 255), -1)
+        cv2.line(frame, ear, shoulder, (255, 0, 0), 2)
+        cv2.line(frame, shoulder, hip, (0, 255, 0), 2)
@@ -1,3 +1,11 @@
+from collections import deque, namedtuple
+
+GOOD = "good"
+BAD = "bad"
+
+# Emitted by StreamingPostureEvaluator whenever the debounced posture state changes
+PostureTransition = namedtuple("PostureTransition", ["timestamp", "previous", "state", "angle", "horizontal_distance"])
+
 class PostureEvaluator:
     def __init__(self, angle_threshold=160, distance_threshold_ratio=0.05):
         self.angle_threshold = angle_threshold
@@ -5,4 +13,147 @@ class PostureEvaluator:
 
     def evaluate_posture(self, angle, horizontal_distance, frame_width):
         distance_threshold = frame_width * self.distance_threshold_ratio  # Calculate threshold
-        return angle < self.angle_threshold or horizontal_distance > distance_threshold
\ No newline at end of file
+        return angle < self.angle_threshold or horizontal_distance > distance_threshold
+
+
+class StreamingPostureEvaluator:
+    def __init__(self, angle_threshold=160, distance_threshold_ratio=0.05, timeout=3, recovery_time=0.0,
+                 angle_hysteresis=3.0, distance_hysteresis_ratio=0.01, window=30, ewma_alpha=0.2,
+                 absence_timeout=3.0):
+        """
+        Long-lived posture evaluator fed with timestamped metrics.
+        - timeout: Seconds of continuous bad posture before the state becomes BAD.
+        - recovery_time: Seconds of continuous good posture before the state returns to GOOD.
+        - angle_hysteresis, distance_hysteresis_ratio: How far back past the thresholds a frame
+          must get before a bad frame counts as good again, so values on the edge don't flap.
+        - window: Number of recent frames used for the sliding-window statistics.
+        - ewma_alpha: Smoothing factor of the exponentially weighted angle average.
+        - absence_timeout: Seconds without landmarks before the user counts as gone. Shorter gaps,
+          such as a missed detection, keep the state and timers as they are.
+        """
+        self.angle_threshold = angle_threshold
+        self.distance_threshold_ratio = distance_threshold_ratio
+        self.timeout = timeout
+        self.recovery_time = recovery_time
+        self.angle_hysteresis = angle_hysteresis
+        self.distance_hysteresis_ratio = distance_hysteresis_ratio
+        self.ewma_alpha = ewma_alpha
+        self.absence_timeout = absence_timeout
+
+        self.state = GOOD
+        self.present = False  # Whether the last update had landmarks
+        self.frame_is_bad = False  # Per-frame classification, after hysteresis
+        self.bad_since = None  # When the current run of bad frames started
+        self.good_since = None  # When the current run of good frames started
+        self.last_timestamp = None
+        self.absent_since = None  # When the current run of frames without landmarks started
+
+        # Sliding window with running sums, so every statistic is O(1) per frame
+        self._angles = deque(maxlen=window)
+        self._distances = deque(maxlen=window)
+        self._bad_flags = deque(maxlen=window)
+        self._angle_sum = 0.0
+        self._distance_sum = 0.0
+        self._bad_count = 0
+        self.angle_ewma = None
+
+    def set_thresholds(self, angle_threshold=None, distance_threshold_ratio=None, timeout=None):
+        """Update thresholds in place; None leaves a value unchanged."""
+        if angle_threshold is not None:
+            self.angle_threshold = angle_threshold
+        if distance_threshold_ratio is not None:
+            self.distance_threshold_ratio = distance_threshold_ratio
+        if timeout is not None:
+            self.timeout = timeout
+
+    def _classify(self, angle, horizontal_distance, frame_width):
+        distance_threshold = frame_width * self.distance_threshold_ratio
+        if self.frame_is_bad:
+            # Stay bad until clearly past the thresholds
+            recovered_angle = angle >= self.angle_threshold + self.angle_hysteresis
+            recovered_distance = horizontal_distance <= distance_threshold - frame_width * self.distance_hysteresis_ratio
+            return not (recovered_angle and recovered_distance)
+        return angle < self.angle_threshold or horizontal_distance > distance_threshold
+
+    def _push(self, angle, horizontal_distance, is_bad):
+        if len(self._angles) == self._angles.maxlen:
+            self._angle_sum -= self._angles[0]
+            self._distance_sum -= self._distances[0]
+            self._bad_count -= self._bad_flags[0]
+        self._angles.append(angle)
+        self._distances.append(horizontal_distance)
+        self._bad_flags.append(is_bad)
+        self._angle_sum += angle
+        self._distance_sum += horizontal_distance
+        self._bad_count += is_bad
+
+        if self.angle_ewma is None:
+            self.angle_ewma = angle
+        else:
+            self.angle_ewma += self.ewma_alpha * (angle - self.angle_ewma)
+
+    def _transition(self, timestamp, state, angle, horizontal_distance):
+        if state == self.state:
+            return None
+        previous, self.state = self.state, state
+        return PostureTransition(timestamp, previous, state, angle, horizontal_distance)
+
+    def update(self, timestamp, angle, horizontal_distance, frame_width):
+        """
+        Feed one frame's metrics.
+        Returns a PostureTransition when the debounced state changes, otherwise None.
+        """
+        self.last_timestamp = timestamp
+        self.present = True
+        self.absent_since = None
+        self.frame_is_bad = self._classify(angle, horizontal_distance, frame_width)
+        self._push(angle, horizontal_distance, self.frame_is_bad)
+
+        if self.frame_is_bad:
+            self.good_since = None
+            if self.bad_since is None:
+                self.bad_since = timestamp
+            if timestamp - self.bad_since >= self.timeout:
+                return self._transition(timestamp, BAD, angle, horizontal_distance)
+        else:
+            self.bad_since = None
+            if self.good_since is None:
+                self.good_since = timestamp
+            if timestamp - self.good_since >= self.recovery_time:
+                return self._transition(timestamp, GOOD, angle, horizontal_distance)
+        return None
+
+    def update_absent(self, timestamp):
+        """
+        Record a frame without landmarks. Once none have been seen for absence_timeout seconds,
+        the user is treated as gone and the state resets to GOOD.
+        """
+        self.last_timestamp = timestamp
+        self.present = False
+        if self.absent_since is None:
+            self.absent_since = timestamp
+        if timestamp - self.absent_since < self.absence_timeout:
+            return None  # Probably a missed detection; hold the state and timers
+        self.frame_is_bad = False
+        self.bad_since = None
+        self.good_since = None
+        return self._transition(timestamp, GOOD, None, None)
+
+    def pending_seconds(self):
+        """Seconds the current run of bad frames has lasted, or 0 when posture is good."""
+        if self.bad_since is None or self.last_timestamp is None:
+            return 0.0
+        return self.last_timestamp - self.bad_since
+
+    def window_stats(self):
+        """Return mean angle, mean distance, EWMA angle and fraction of bad frames over the window."""
+        count = len(self._angles)
+        if count == 0:
+            return {"frames": 0, "mean_angle": None, "mean_distance": None, "ewma_angle": None, "bad_fraction": None}
+        return {
+            "frames": count,
+            "mean_angle": self._angle_sum / count,
+            "mean_distance": self._distance_sum / count,
+            "ewma_angle": self.angle_ewma,
+            "bad_fraction": self._bad_count / count,
+        }
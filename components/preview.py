@@ -0,0 +1,127 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from components.landmarks import PoseLandmarks
+from components.pose_detection import PoseDetector
+
+def draw_overlay(frame, landmarks, angle):
+    """Draw the pose lines and the current angle onto frame."""
+    if landmarks is not None:
+        PoseDetector.visualize_pose(frame, landmarks)
+    if angle is not None:
+        cv2.putText(
+            frame,
+            f"Current Angle: {int(angle)}°",
+            (10, 30),  # Position on the frame (x, y)
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1,  # Font scale
+            (255, 255, 255),  # Font color (white)
+            2,  # Line thickness
+            cv2.LINE_AA,
+        )
+
+
+class PreviewRenderer:
+    def __init__(self, max_fps=15, window_name="Posture Detection"):
+        """
+        Show the camera feed with the pose overlay from its own thread.
+        The detection loop offers frames with submit(); while the preview is hidden nothing is
+        copied or drawn, and while it is shown at most max_fps frames are taken.
+        """
+        self.window_name = window_name
+        self.interval = 1.0 / max_fps
+        self.visible = False
+        self.quit_requested = False  # Set when "q" is pressed in the preview window
+
+        # Latest submitted frame and landmarks, copied into buffers owned by the renderer
+        self._frame = None
+        self._landmarks = PoseLandmarks()
+        self._has_landmarks = False
+        self._angle = None
+        self._fresh = False
+        self._last_submit = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def set_visible(self, visible):
+        """Show or hide the preview window; the render thread starts the first time it is shown."""
+        with self._condition:
+            self.visible = visible
+            if visible and self._thread is None:
+                self._thread = threading.Thread(target=self._render_loop, name="preview", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def submit(self, frame, landmarks, angle):
+        """
+        Offer the latest frame. Returns at once while hidden, or if the last frame was taken
+        less than 1/max_fps ago; otherwise the frame is copied so the caller can reuse it.
+        """
+        if not self.visible:
+            return
+        now = time.monotonic()
+        if now - self._last_submit < self.interval:
+            return
+        self._last_submit = now
+        with self._condition:
+            if self._frame is None or self._frame.shape != frame.shape:
+                self._frame = np.empty_like(frame)
+            np.copyto(self._frame, frame)
+            self._has_landmarks = landmarks is not None
+            if landmarks is not None:
+                np.copyto(self._landmarks.data, landmarks.data)
+            self._angle = angle
+            self._fresh = True
+            self._condition.notify()
+
+    def _render_loop(self):
+        canvas = None  # Frame the overlay is drawn on, separate from the submit buffer
+        landmarks = PoseLandmarks()
+        shown = False
+        while True:
+            with self._condition:
+                # While the window is open, wake up regularly to keep it responsive. Showing the
+                # window waits for a first frame; only hiding it needs waking up for by itself.
+                self._condition.wait_for(
+                    lambda: self._fresh or self._closed or (shown and not self.visible),
+                    timeout=self.interval if shown else None,
+                )
+                if self._closed:
+                    break
+                visible = self.visible
+                fresh = self._fresh and visible
+                if fresh:
+                    if canvas is None or canvas.shape != self._frame.shape:
+                        canvas = np.empty_like(self._frame)
+                    np.copyto(canvas, self._frame)
+                    np.copyto(landmarks.data, self._landmarks.data)
+                    has_landmarks, angle = self._has_landmarks, self._angle
+                    self._fresh = False
+
+            if not visible:
+                if shown:
+                    cv2.destroyWindow(self.window_name)
+                    shown = False
+                continue
+            if fresh:
+                draw_overlay(canvas, landmarks if has_landmarks else None, angle)
+                cv2.imshow(self.window_name, canvas)
+                shown = True
+            if shown and cv2.waitKey(1) & 0xFF == ord("q"):
+                self.quit_requested = True
+
+        if shown:
+            cv2.destroyWindow(self.window_name)
+
+    def close(self):
+        """Stop the render thread and close the window."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            cv2.destroyAllWindows()  # Only once a window may have been opened; headless OpenCV builds have none
@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+
+def _latency_summary(durations):
+    """Return count, mean, p50/p95/p99 (ms) and throughput for an array of durations in seconds."""
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99]) * 1000.0
+    total = durations.sum()
+    return {
+        "count": int(durations.size),
+        "mean_ms": float(durations.mean() * 1000.0),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "fps": float(durations.size / total) if total > 0 else float("inf"),
+    }
+
+
+class StageTimings:
+    """Collect per-stage latencies of the detection pipeline."""
+
+    def __init__(self):
+        self.samples = {}  # Stage name -> list of durations in seconds
+        self.stage_order = []
+
+    def record(self, stage, seconds):
+        """Record one duration (in seconds) for a stage."""
+        if stage not in self.samples:
+            self.samples[stage] = []
+            self.stage_order.append(stage)
+        self.samples[stage].append(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """Time the body of a with-block as one sample of the given stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """Return count, throughput and p50/p95/p99 latency (ms) for every stage."""
+        return {
+            stage: _latency_summary(np.asarray(self.samples[stage], dtype=np.float64))
+            for stage in self.stage_order
+        }
+
+    def format_report(self, frames=None, wall_seconds=None):
+        """Format the summary as a human-readable table."""
+        lines = [f"{'stage':<12}{'count':>8}{'fps':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"{stage:<12}{stats['count']:>8}{stats['fps']:>10.1f}{stats['mean_ms']:>10.2f}"
+                f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            )
+        if frames is not None and wall_seconds:
+            lines.append(f"end-to-end: {frames} frames in {wall_seconds:.2f}s ({frames / wall_seconds:.1f} fps)")
+        return "\n".join(lines)
+
+
+class RollingHistogram:
+    """Fixed-size ring of the most recent durations; recording never allocates."""
+
+    def __init__(self, window=512):
+        self.values = np.zeros(window, dtype=np.float64)
+        self.total = 0  # Samples ever recorded
+        self.total_seconds = 0.0  # Sum of every sample ever recorded
+
+    def record(self, seconds):
+        self.values[self.total % self.values.size] = seconds
+        self.total += 1
+        self.total_seconds += seconds
+
+    def summary(self):
+        filled = min(self.total, self.values.size)
+        if filled == 0:
+            return None
+        summary = _latency_summary(self.values[:filled].copy())
+        summary["count"] = self.total
+        summary["total_s"] = self.total_seconds
+        return summary
+
+
+class _StageTimer:
+    """Reusable context manager that records its duration into one histogram."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class PipelineStats:
+    """
+    Low-overhead stage timings and counters for the live detection loop.
+    - enabled: When False, stage() and increment() do no work at all.
+    - window: Number of recent samples kept per stage.
+    """
+
+    def __init__(self, enabled=True, window=512):
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}
+        self.timers = {}
+        self.counters = {}
+        self.status = {}  # Latest posture state and metrics, published by the detection loop
+        self.started_at = time.time()
+
+    def stage(self, name):
+        """Return a context manager timing one pass through the named stage."""
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self.timers.get(name)
+        if timer is None:
+            histogram = RollingHistogram(self.window)
+            self.histograms[name] = histogram
+            timer = self.timers[name] = _StageTimer(histogram)
+        return timer
+
+    def record(self, name, seconds):
+        """Record a duration measured elsewhere, such as in another process."""
+        if self.enabled:
+            self.stage(name).histogram.record(seconds)
+
+    def increment(self, name, amount=1):
+        """Add to a named counter."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_counter(self, name, value):
+        """Set a counter that is tracked elsewhere, such as the camera's dropped frames."""
+        if self.enabled:
+            self.counters[name] = value
+
+    def set_status(self, name, value):
+        """Publish a piece of the current posture state, such as the latest angle."""
+        if self.enabled:
+            self.status[name] = value
+
+    def snapshot(self):
+        """Return a JSON-serialisable view of the current counters and stage latencies."""
+        stages = {}
+        for name, histogram in list(self.histograms.items()):
+            summary = histogram.summary()
+            if summary is not None:
+                stages[name] = summary
+        return {
+            "timestamp": time.time(),
+            "uptime_s": time.time() - self.started_at,
+            "counters": dict(self.counters),
+            "status": dict(self.status),
+            "stages": stages,
+        }
+
+
+def format_stats_line(snapshot):
+    """Format a stats snapshot as a single log line."""
+    counters = " ".join(f"{name}={value}" for name, value in sorted(snapshot["counters"].items()))
+    stages = " ".join(
+        f"{name}={stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}ms" for name, stats in snapshot["stages"].items()
+    )
+    return f"[stats] {counters} | p50/p95 {stages}"
+
+
+class StatsReporter(ABC):
+    """Periodically hands a stats snapshot to report() on a background thread."""
+
+    def __init__(self, stats, interval=10.0):
+        self.stats = stats
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.report(self.stats.snapshot())
+
+    @abstractmethod
+    def report(self, snapshot):
+        """Publish one snapshot from PipelineStats.snapshot()."""
+
+
+class LogReporter(StatsReporter):
+    """Prints a one-line summary every interval."""
+
+    def report(self, snapshot):
+        print(format_stats_line(snapshot))
+
+
+class JsonFileReporter(StatsReporter):
+    """Rewrites a JSON file with the latest snapshot every interval."""
+
+    def __init__(self, stats, path="stats.json", interval=10.0):
+        super().__init__(stats, interval)
+        self.path = path
+
+    def report(self, snapshot):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(snapshot, file, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error writing stats file: {e}")
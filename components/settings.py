@@ -0,0 +1,77 @@
+import json
+import os
+from collections import namedtuple
+
+# Immutable view of the user-facing settings, replaced as a whole whenever one of them changes
+SettingsSnapshot = namedtuple(
+    "SettingsSnapshot",
+    ["angle_threshold", "distance_threshold_ratio", "alert_method", "timeout", "show_camera"],
+)
+
+SETTINGS_FILE = "settings.txt"
+
+DEFAULT_SETTINGS = {
+    "angle_threshold": 160,
+    "distance_threshold_ratio": 0.05,
+    "alert_method": "GUI",
+    "timeout": 3,
+}
+
+
+def load_settings(path=SETTINGS_FILE, defaults=None):
+    """
+    Load the settings.txt JSON, filling in missing keys from defaults.
+    Returns the defaults if the file doesn't exist or is corrupted.
+    """
+    defaults = DEFAULT_SETTINGS if defaults is None else defaults
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as file:
+                settings = json.load(file)
+            for key, value in defaults.items():
+                settings.setdefault(key, value)
+            return settings
+        except Exception as e:
+            print(f"Error reading settings file: {e}")
+    return dict(defaults)
+
+
+def save_settings(settings, path=SETTINGS_FILE):
+    """Write settings back to the settings.txt JSON."""
+    try:
+        with open(path, "w") as file:
+            json.dump(settings, file)
+    except Exception as e:
+        print(f"Error saving settings file: {e}")
+
+
+class HeadlessSettings:
+    def __init__(self, path=SETTINGS_FILE, overrides=None):
+        """
+        Settings provider for running without the GUI, read by the detection loop like PostureGUI.
+        - path: The settings.txt JSON file.
+        - overrides: Keys that take precedence over the file, e.g. from the command line.
+        """
+        self.path = path
+        self.overrides = dict(overrides or {})
+        self.reload()
+
+    def _build_snapshot(self):
+        return SettingsSnapshot(
+            angle_threshold=self.settings["angle_threshold"],
+            distance_threshold_ratio=self.settings["distance_threshold_ratio"],
+            alert_method=self.settings["alert_method"],
+            timeout=self.settings["timeout"],
+            show_camera=self.settings.get("show_camera", False),
+        )
+
+    def get_settings(self):
+        """Return the current SettingsSnapshot; safe to call from any thread."""
+        return self.snapshot
+
+    def reload(self):
+        """Re-read the settings file and publish a new snapshot; the loop picks it up on its next frame."""
+        settings = load_settings(self.path)
+        settings.update(self.overrides)
+        self.settings = settings
+        self.snapshot = self._build_snapshot()
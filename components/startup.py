@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Only the standard library is imported here, so entry points can use this module
+# before the window is up without paying for OpenCV, MediaPipe or NumPy
+
+def load_dlls(dll_folder="./dlls"):
+    """Put the bundled Windows DLLs (used by the Stream Deck library) on the PATH."""
+    if sys.platform != "win32":
+        return
+    dll_folder = os.path.abspath(dll_folder)
+    if not os.path.exists(dll_folder):
+        print(f"DLL folder not found: {dll_folder}")
+        return
+    os.environ["PATH"] = dll_folder + os.pathsep + os.environ["PATH"]
+
+
+class StartupProfile:
+    def __init__(self, enabled=True, origin=None):
+        """
+        Timeline of startup phases up to the first posture evaluation, for --profile-startup.
+        - enabled: When False, phase() and mark() do no work.
+        - origin: time.perf_counter() value the timeline starts from; take it before the heavy imports.
+        """
+        self.enabled = enabled
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []  # (name, thread name, start, end) in seconds since origin
+        self.finished = not enabled  # Lets the detection loop skip its checks once startup is over
+        self._lock = threading.Lock()
+
+    def _add(self, name, start, end):
+        with self._lock:
+            self.phases.append((name, threading.current_thread().name, start - self.origin, end - self.origin))
+
+    @contextmanager
+    def phase(self, name):
+        """Record the body of a with-block as one startup phase."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """Record a point in time, such as the first frame arriving."""
+        if self.enabled:
+            now = time.perf_counter()
+            self._add(name, now, now)
+
+    def finish(self, name="first evaluation"):
+        """Mark the end of startup and print the report, once."""
+        if self.finished:
+            return
+        self.mark(name)
+        self.finished = True
+        print(self.format_report())
+
+    def format_report(self):
+        """Format the phases as a table ordered by start time."""
+        lines = [f"{'startup phase':<24}{'thread':<20}{'start ms':>10}{'end ms':>10}{'took ms':>10}"]
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+        for name, thread, start, end in phases:
+            lines.append(f"{name:<24}{thread:<20}{start * 1000:>10.1f}{end * 1000:>10.1f}{(end - start) * 1000:>10.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,198 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from components.camera import Camera
+from components.history import PostureHistoryWriter
+from components.multiprocess_pipeline import SharedFrameRing
+from components.posture_evaluation import StreamingPostureEvaluator, BAD
+from components.warnings.alert_manager import PostureAlertManager
+from components.warnings.console_warning import ConsoleWarning
+from components.warnings.dispatcher import AlertDispatcher
+
+
+def pose_worker(spec, detector_options, task_queue, result_queue):
+    """Pool worker: run pose inference on ring slots named by the scheduler."""
+    from components.pose_detection import PoseDetector
+    ring = SharedFrameRing.attach(spec)
+    pose_detector = PoseDetector(**detector_options)
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            slot, stream_index, timestamp = task
+            frame = ring.frame(slot)
+            started = time.perf_counter()
+            landmarks = pose_detector.get_pose_landmarks(frame)
+            metrics = pose_detector.calculate_metrics(landmarks, frame) if landmarks else None
+            visibility = landmarks.visibility() if landmarks else 0.0
+            result_queue.put((slot, stream_index, timestamp, metrics, visibility, time.perf_counter() - started))
+    finally:
+        ring.close()
+
+
+class MonitoredStream:
+    def __init__(self, name, source, fps, width, height, evaluator_options, sinks, history_path=None):
+        """
+        One video source with its own capture thread, evaluator and alert state.
+        - history_path: Optional posture history log for this source.
+        """
+        self.name = name
+        self.fps = fps
+        self.camera = Camera(width, height, fps, threaded=True, source=source)
+        self.evaluator = StreamingPostureEvaluator(**evaluator_options)
+        self.alert_manager = PostureAlertManager()
+        self.dispatcher = AlertDispatcher(self.alert_manager)
+        for sink in sinks:
+            self.dispatcher.register(sink)
+        self.history = PostureHistoryWriter(history_path) if history_path else None
+
+        self.next_due = 0.0  # Earliest time the fps budget allows another inference
+        self.in_flight = False
+        self.frames_processed = 0
+        self.no_landmark_frames = 0
+        self.alerts_fired = 0
+        self.last_latency = None
+
+    def status(self):
+        return {
+            "name": self.name,
+            "state": self.evaluator.state,
+            "present": self.evaluator.present,
+            "frames_processed": self.frames_processed,
+            "no_landmark_frames": self.no_landmark_frames,
+            "alerts_fired": self.alerts_fired,
+            "dropped_frames": self.camera.dropped_frames,
+            "last_latency_ms": self.last_latency * 1000.0 if self.last_latency is not None else None,
+            "window": self.evaluator.window_stats(),
+        }
+
+
+class StreamMonitor:
+    def __init__(self, sources, workers=None, fps=5, width=640, height=480, detector_options=None,
+                 evaluator_options=None, sink_factory=None, history_dir=None):
+        """
+        Monitor several video sources with one bounded pool of PoseDetector processes.
+        - sources: Device indices, video file paths or stream URLs.
+        - workers: Pool size; defaults to the number of CPU cores minus one.
+        - fps: Per-stream inference budget.
+        - sink_factory: Called with a stream name, returns the alert sinks for that stream.
+        - history_dir: If set, each stream logs its posture history to "<name>.history" in it.
+        """
+        workers = workers or max(1, multiprocessing.cpu_count() - 1)
+        sink_factory = sink_factory or (lambda name: [ConsoleWarning(name)])
+        detector_options = dict(detector_options or {})
+        # Workers serve frames from every stream, so they must not carry tracking state between calls
+        detector_options["static_image_mode"] = True
+
+        self.streams = [
+            MonitoredStream(f"stream-{index}", source, fps, width, height, evaluator_options or {},
+                            sink_factory(f"stream-{index}"),
+                            os.path.join(history_dir, f"stream-{index}.history") if history_dir else None)
+            for index, source in enumerate(sources)
+        ]
+        # One slot per worker: a frame is copied in once and only its index crosses processes
+        self.ring = SharedFrameRing(workers, (height, width, 3))
+        self.free_slots = list(range(workers))
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        self.workers = [
+            multiprocessing.Process(
+                target=pose_worker, name=f"pose-worker-{index}", daemon=True,
+                args=(self.ring.spec, detector_options, self.task_queue, self.result_queue),
+            )
+            for index in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+        self._next_stream = 0  # Round-robin cursor
+        self._stop_event = threading.Event()
+
+    def _schedule(self, now):
+        """Give free slots to streams in round-robin order, respecting each stream's fps budget."""
+        scheduled = False
+        checked = 0
+        while self.free_slots and checked < len(self.streams):
+            stream_index = self._next_stream
+            stream = self.streams[stream_index]
+            self._next_stream = (self._next_stream + 1) % len(self.streams)
+            checked += 1
+            if stream.in_flight or now < stream.next_due:
+                continue
+            latest = stream.camera.get_latest(timeout=0)
+            if latest is None:
+                continue
+            frame = latest[0]
+            slot = self.free_slots.pop()
+            target = self.ring.frame(slot)
+            if frame.shape == target.shape:
+                target[:] = frame
+            else:
+                cv2.resize(frame, (target.shape[1], target.shape[0]), dst=target)
+            stream.camera.release_frame(frame)
+            stream.in_flight = True
+            stream.next_due = max(stream.next_due + 1.0 / stream.fps, now)
+            self.task_queue.put((slot, stream_index, now))
+            checked = 0  # A stream got work; give every stream another turn
+            scheduled = True
+        return scheduled
+
+    def _handle_result(self, result):
+        slot, stream_index, timestamp, metrics, visibility, latency = result
+        self.free_slots.append(slot)
+        stream = self.streams[stream_index]
+        stream.in_flight = False
+        stream.frames_processed += 1
+        stream.last_latency = latency
+        angle = horizontal_distance = None
+        if metrics is None:
+            stream.no_landmark_frames += 1
+            transition = stream.evaluator.update_absent(timestamp)
+        else:
+            angle, horizontal_distance = metrics
+            transition = stream.evaluator.update(timestamp, angle, horizontal_distance, self.ring.shape[1])
+        if stream.history is not None:
+            stream.history.append(time.time(), angle, horizontal_distance, visibility,
+                                  stream.evaluator.state == BAD, metrics is not None)
+        if transition is not None:
+            if transition.state == BAD:
+                stream.alerts_fired += 1
+            stream.dispatcher.publish_transition(transition, {"Console"})
+
+    def run(self):
+        """Schedule frames and collect results until stop() is called or every source has ended."""
+        while not self._stop_event.is_set():
+            if not any(stream.camera.is_opened() or stream.in_flight for stream in self.streams):
+                break
+            self._schedule(time.monotonic())
+            try:
+                self._handle_result(self.result_queue.get(timeout=0.01))
+                while True:
+                    self._handle_result(self.result_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+    def stop(self):
+        self._stop_event.set()
+
+    def status(self):
+        return [stream.status() for stream in self.streams]
+
+    def close(self):
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        for stream in self.streams:
+            stream.camera.release()
+            stream.dispatcher.close()
+            if stream.history is not None:
+                stream.history.close()
+        self.ring.close()
@@ -3,9 +3,12 @@ import math
 
 def calculate_angle(a, b, c):
     """Calculate the angle between three points."""
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
     radians = math.atan2(c[1] - b[1], c[0] - b[0]) - math.atan2(a[1] - b[1], a[0] - b[0])
     angle = abs(radians * 180.0 / math.pi)
-    return 360 - angle if angle > 180 else angle
\ No newline at end of file
+    return 360 - angle if angle > 180 else angle
+
+def calculate_angles(a, b, c):
+    """Vectorized calculate_angle for arrays of points shaped (..., 2)."""
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180, 360 - angle, angle)
\ No newline at end of file
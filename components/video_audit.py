@@ -0,0 +1,297 @@
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+from components.history import HISTORY_DTYPE
+from components.posture_evaluation import PostureEvaluator
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# Time series columns of an audited video, saved one array per column; "timestamp" is seconds into the video
+COLUMNS = HISTORY_DTYPE.names
+
+SUMMARY_FIELDS = [
+    "video", "duration_seconds", "frames", "present_frames", "bad_frames", "bad_percent",
+    "mean_angle", "median_angle", "mean_horizontal_distance", "longest_bad_seconds",
+]
+
+_worker = {}  # Per-process PoseDetector and evaluator, created once by _init_worker
+
+
+def find_videos(directory):
+    """Return the video files under directory, in name order."""
+    videos = []
+    for root, _, names in os.walk(directory):
+        videos.extend(os.path.join(root, name) for name in names if name.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(videos)
+
+
+def output_name(directory, video):
+    """Name a video's outputs after its path inside the archive, so equal file names don't collide."""
+    relative = os.path.splitext(os.path.relpath(video, directory))[0]
+    return relative.replace(os.sep, "__").replace("/", "__")
+
+
+def plan_chunks(video, chunk_seconds):
+    """
+    Split a video into chunks of about chunk_seconds.
+    Returns (fps, [(start_frame, end_frame), ...]); the last chunk's end is None, so it runs
+    to the end of the file even when the container's frame count is off.
+    """
+    cap = cv2.VideoCapture(video)
+    try:
+        if not cap.isOpened():
+            return None, []
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    chunk_frames = max(1, int(round(chunk_seconds * fps)))
+    starts = list(range(0, max(frame_count, 1), chunk_frames))
+    return fps, [(start, end) for start, end in zip(starts, starts[1:] + [None])]
+
+
+def _chunk_path(chunk_dir, start):
+    return os.path.join(chunk_dir, f"{start:010d}.npz")
+
+
+def save_columns(path, records, **extra):
+    """Write records as one array per column, replacing path atomically."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.savez(file, **{name: records[name] for name in COLUMNS}, **extra)
+    os.replace(temp_path, path)
+
+
+def load_columns(path):
+    """Read a file written by save_columns back into a HISTORY_DTYPE array."""
+    with np.load(path) as columns:
+        records = np.zeros(len(columns[COLUMNS[0]]), dtype=HISTORY_DTYPE)
+        for name in COLUMNS:
+            records[name] = columns[name]
+    return records
+
+
+def stored_options(path):
+    """Return the options a finished "<name>.npz" was audited with, or None if it doesn't record them."""
+    with np.load(path) as columns:
+        return str(columns["options"]) if "options" in columns.files else None
+
+
+def _init_worker(detector_options, evaluator_options):
+    cv2.setNumThreads(1)  # Parallelism comes from the processes; more threads per process only contend
+    try:
+        from components.pose_detection import PoseDetector
+        _worker["detector"] = PoseDetector(**detector_options)
+    except Exception as e:
+        # Raising here would make the pool restart the worker forever; fail its tasks instead
+        _worker["error"] = f"could not load the pose model: {e}"
+    _worker["evaluator"] = PostureEvaluator(**evaluator_options)
+
+
+def audit_chunk(task):
+    """
+    Pool task: analyze frames [start, end) of a video and save their time series to output_path.
+    Frames are decoded one at a time and only every step-th is analyzed; the others are grabbed
+    without being converted. Returns (video, start, frames analyzed, error message or None).
+    """
+    video, fps, start, end, step, output_path = task
+    if "error" in _worker:
+        return video, start, 0, _worker["error"]
+    pose_detector, evaluator = _worker["detector"], _worker["evaluator"]
+    capacity = max(1, (end - start + step - 1) // step) if end is not None else 1024
+    records = np.zeros(capacity, dtype=HISTORY_DTYPE)
+    count = 0
+    cap = cv2.VideoCapture(video)
+    try:
+        if not cap.isOpened():
+            return video, start, 0, "could not open video"
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while end is None or index < end:
+            if (index - start) % step:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            landmarks = pose_detector.get_pose_landmarks(frame)
+            if count == len(records):
+                records = np.resize(records, 2 * len(records))
+            record = records[count]
+            record["timestamp"] = index / fps
+            if landmarks:
+                angle, horizontal_distance = pose_detector.calculate_metrics(landmarks, frame)
+                record["angle"] = angle
+                record["horizontal_distance"] = horizontal_distance
+                record["visibility"] = landmarks.visibility()
+                record["bad"] = evaluator.evaluate_posture(angle, horizontal_distance, frame.shape[1])
+                record["present"] = 1
+            else:
+                record["angle"] = record["horizontal_distance"] = np.nan
+                record["visibility"] = record["bad"] = record["present"] = 0
+            count += 1
+            index += 1
+    except Exception as e:
+        return video, start, count, str(e)
+    finally:
+        cap.release()
+    save_columns(output_path, records[:count])
+    return video, start, count, None
+
+
+def summarize(name, records, fps, step):
+    """Return the SUMMARY_FIELDS row for one audited video."""
+    present = records["present"] == 1
+    bad = present & (records["bad"] == 1)
+    angles = records["angle"][present]
+    # Longest run of consecutive bad samples, each covering step frames of the video
+    longest = 0
+    if bad.any():
+        edges = np.diff(np.concatenate(([0], bad.astype(np.int8), [0])))
+        longest = int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+    duration = (records["timestamp"][-1] + step / fps) if len(records) else 0.0
+    return {
+        "video": name,
+        "duration_seconds": round(float(duration), 2),
+        "frames": len(records),
+        "present_frames": int(present.sum()),
+        "bad_frames": int(bad.sum()),
+        "bad_percent": round(bad.sum() * 100.0 / present.sum(), 1) if present.any() else "",
+        "mean_angle": round(float(angles.mean()), 1) if len(angles) else "",
+        "median_angle": round(float(np.median(angles)), 1) if len(angles) else "",
+        "mean_horizontal_distance":
+            round(float(records["horizontal_distance"][present].mean()), 1) if len(angles) else "",
+        "longest_bad_seconds": round(longest * step / fps, 1),
+    }
+
+
+class VideoAudit:
+    def __init__(self, directory, output_dir, workers=None, chunk_seconds=60, sample_fps=5,
+                 detector_options=None, evaluator_options=None):
+        """
+        Analyze every video in a directory with a pool of PoseDetector processes.
+        Videos are split into chunks of chunk_seconds that the workers analyze independently, so
+        a few long recordings still keep every core busy. Each finished chunk is saved at once;
+        an interrupted audit picks up where it stopped when run again with the same options.
+        Results are keyed by every option that affects them; with other options, videos are
+        audited again rather than mixed with earlier results.
+        Each video's time series goes to "<name>.npz" in output_dir, one array per column of
+        HISTORY_DTYPE, and "summary.csv" gets one SUMMARY_FIELDS row per video.
+        - workers: Pool size; defaults to the number of CPU cores.
+        - sample_fps: Frames analyzed per second of video.
+        """
+        self.directory = directory
+        self.output_dir = output_dir
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_seconds = chunk_seconds
+        self.sample_fps = sample_fps
+        detector_options = dict(detector_options or {})
+        # Seeking to a chunk jumps in time; don't let the model track across the cut
+        detector_options["static_image_mode"] = True
+        self.detector_options = detector_options
+        self.evaluator_options = evaluator_options or {}
+        # Everything the per-sample results depend on, stored with them and used to key the chunks
+        self.options = json.dumps({
+            "detector": self.detector_options,
+            "evaluator": self.evaluator_options,
+            "chunk_seconds": chunk_seconds,
+            "sample_fps": sample_fps,
+        }, sort_keys=True)
+        self.options_key = hashlib.sha1(self.options.encode("utf-8")).hexdigest()[:12]
+
+    def _plan(self):
+        """Return {name: (video, fps, step, [chunk paths])} and the chunk tasks still to run."""
+        videos = {}
+        tasks = []
+        for video in find_videos(self.directory):
+            name = output_name(self.directory, video)
+            finished = os.path.join(self.output_dir, name + ".npz")
+            if os.path.exists(finished):
+                if stored_options(finished) == self.options:
+                    continue  # Finished by an earlier run
+                print(f"{video} was audited with other options; auditing it again")
+            fps, chunks = plan_chunks(video, self.chunk_seconds)
+            if not chunks:
+                print(f"Skipping {video}: could not open it")
+                continue
+            step = max(1, int(round(fps / self.sample_fps)))
+            # The options are part of the folder name, so chunks from runs with other options are never mixed in
+            chunk_dir = os.path.join(self.output_dir, "chunks", f"{name}.{self.options_key}")
+            os.makedirs(chunk_dir, exist_ok=True)
+            paths = []
+            for start, end in chunks:
+                # Align each chunk to the sampling grid, so chunks join without gaps or repeats
+                start = -(-start // step) * step
+                path = _chunk_path(chunk_dir, start)
+                paths.append(path)
+                if not os.path.exists(path):
+                    tasks.append((video, fps, start, end, step, path))
+            videos[name] = (video, fps, step, paths)
+        return videos, tasks
+
+    def _finish(self, name, fps, step, paths):
+        """Join a video's chunks into its time series file and drop the chunks."""
+        records = np.concatenate([load_columns(path) for path in paths])
+        save_columns(os.path.join(self.output_dir, name + ".npz"), records,
+                     fps=np.float64(fps), step=np.int64(step), options=np.array(self.options))
+        shutil.rmtree(os.path.dirname(paths[0]), ignore_errors=True)
+
+    def _write_summary(self):
+        """Rewrite summary.csv from every video finished with the current options, including in earlier runs."""
+        rows = []
+        for entry in sorted(os.listdir(self.output_dir)):
+            if not entry.endswith(".npz"):
+                continue
+            path = os.path.join(self.output_dir, entry)
+            if stored_options(path) != self.options:
+                print(f"Leaving {entry} out of summary.csv: it was audited with other options")
+                continue
+            with np.load(path) as columns:
+                fps, step = float(columns["fps"]), int(columns["step"])
+            rows.append(summarize(entry[:-len(".npz")], load_columns(path), fps, step))
+        temp_path = os.path.join(self.output_dir, "summary.csv.tmp")
+        with open(temp_path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(temp_path, os.path.join(self.output_dir, "summary.csv"))
+        return rows
+
+    def run(self, progress=print):
+        """
+        Run the audit and return the summary rows of the videos finished so far.
+        - progress: Called with a status line after each chunk.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        videos, tasks = self._plan()
+        failed = set()
+        done = 0
+        if tasks:
+            with multiprocessing.Pool(min(self.workers, len(tasks)), initializer=_init_worker,
+                                      initargs=(self.detector_options, self.evaluator_options)) as pool:
+                for video, start, frames, error in pool.imap_unordered(audit_chunk, tasks):
+                    done += 1
+                    if error is not None:
+                        failed.add(video)
+                        progress(f"[{done}/{len(tasks)}] {video} @ frame {start}: failed, {error}")
+                    else:
+                        progress(f"[{done}/{len(tasks)}] {video} @ frame {start}: {frames} frames")
+        for name, (video, fps, step, paths) in videos.items():
+            if video in failed or not all(os.path.exists(path) for path in paths):
+                continue
+            self._finish(name, fps, step, paths)
+        try:
+            os.rmdir(os.path.join(self.output_dir, "chunks"))  # Only succeeds once nothing is left to resume
+        except OSError:
+            pass
+        return self._write_summary()
@@ -13,12 +13,20 @@ class PostureWarning:
         self.deck.open()
         self.deck.reset()
         self.bad_posture_start_time = None
+        self._image_cache = {}  # color -> native key image
+        self._current_color = None
 
     def set_all_keys_color(self, color):
         """Set all keys on the Stream Deck to a specified color."""
+        if color == self._current_color:
+            return
+        image = self._image_cache.get(color)
+        if image is None:
+            image = self._image_cache[color] = PILHelper.to_native_format(
+                self.deck, PILHelper.create_image(self.deck, background=color))
         for key in range(self.deck.key_count()):
-            image = PILHelper.create_image(self.deck, background=color)
-            self.deck.set_key_image(key, PILHelper.to_native_format(self.deck, image))
+            self.deck.set_key_image(key, image)
+        self._current_color = color
 
     def update_warnings(self, is_bad_posture, frame, angle=None, horizontal_distance=None):
         """
@@ -63,5 +71,6 @@ class PostureWarning:
 
     def close(self):
         """Close the Stream Deck connection."""
+        self._current_color = None
         self.deck.reset()
         self.deck.close()
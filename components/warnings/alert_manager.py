@@ -1,16 +1,26 @@
-import time
+from components.posture_evaluation import BAD
 
 class PostureAlertManager:
     def __init__(self):
-        self.bad_posture_start_time = None
+        self.alert_active = False  # True between a transition to BAD and the next transition to GOOD
+        self.last_transition = None
+
+    def handle_transition(self, transition):
+        """
+        Record a state change from StreamingPostureEvaluator.
+        - transition: PostureTransition emitted by the evaluator.
+        """
+        self.last_transition = transition
+        self.alert_active = transition.state == BAD
 
     def should_alert(self, is_bad_posture):
         """
         Add extra logic here just incase it needs to be
         - is_bad_posture: Boolean indicating if the posture is bad.
         """
-        if is_bad_posture:
-            return True
-        else:
-            self.bad_posture_start_time = None
-            return False  # Reset timer and do not alert
+        return bool(is_bad_posture)
+
+    def reset(self):
+        """Forget the current alert state."""
+        self.alert_active = False
+        self.last_transition = None
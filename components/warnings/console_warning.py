@@ -0,0 +1,21 @@
+import time
+
+from components.posture_evaluation import BAD
+from components.warnings.dispatcher import AlertSink, DROP, TRANSITION
+
+class ConsoleWarning(AlertSink):
+    event_kinds = (TRANSITION,)
+    policy = DROP
+
+    def __init__(self, label=None):
+        """
+        Print posture state changes, for headless and multi-stream setups.
+        - label: Prefix identifying the desk or stream.
+        """
+        self.label = label
+
+    def handle(self, event):
+        prefix = f"[{self.label}] " if self.label else ""
+        status = "Bad posture" if event.state == BAD else "Good posture"
+        angle = f" (angle {int(event.angle)}°)" if event.angle is not None else ""
+        print(f"{time.strftime('%H:%M:%S')} {prefix}{status}{angle}")
@@ -0,0 +1,145 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+
+from components.posture_evaluation import BAD
+
+# Event kinds
+TRANSITION = "transition"  # Debounced posture state changed
+METHODS_CHANGED = "methods_changed"  # The set of active alert methods changed
+READOUT = "readout"  # Live per-frame values for sinks that display them
+
+# Backpressure policies, applied per sink when it falls behind
+DROP = "drop"  # Bounded queue; new events are dropped when it is full
+COALESCE = "coalesce"  # A pending event is replaced by a newer one of the same kind
+LATEST = "latest"  # Only the newest event is kept
+
+PostureEvent = namedtuple(
+    "PostureEvent",
+    ["kind", "timestamp", "state", "methods", "angle", "horizontal_distance", "pending_seconds", "timeout"],
+)
+
+def make_event(kind, timestamp, state, methods, angle=None, horizontal_distance=None, pending_seconds=0.0, timeout=0):
+    return PostureEvent(kind, timestamp, state, frozenset(methods), angle, horizontal_distance, pending_seconds, timeout)
+
+def event_to_dict(event):
+    """Return a JSON-serialisable dict for an event."""
+    data = event._asdict()
+    data["methods"] = sorted(event.methods)
+    data["is_bad_posture"] = event.state == BAD
+    return data
+
+
+class AlertSink(ABC):
+    """
+    Base class for alert sinks. handle() runs on the sink's own worker thread.
+    - event_kinds: Event kinds the sink wants to receive.
+    - policy: Default backpressure policy.
+    """
+    event_kinds = (TRANSITION, METHODS_CHANGED)
+    policy = LATEST
+
+    @abstractmethod
+    def handle(self, event):
+        """Deliver one PostureEvent."""
+
+    def close(self):
+        pass
+
+
+class _SinkWorker:
+    def __init__(self, sink, policy, max_queue):
+        self.sink = sink
+        self.policy = policy
+        self.max_queue = max_queue
+        self.delivered = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def offer(self, event):
+        """Queue an event according to the backpressure policy; never blocks on the sink."""
+        with self._condition:
+            if self.policy == LATEST:
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            elif self.policy == COALESCE:
+                for index, pending in enumerate(self._queue):
+                    if pending.kind == event.kind:
+                        self._queue[index] = event
+                        self.dropped += 1
+                        return
+            elif len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(event)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+            try:
+                self.sink.handle(event)
+                self.delivered += 1
+            except Exception as e:
+                print(f"Error in alert sink {type(self.sink).__name__}: {e}")
+
+    def close(self, timeout):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self.sink.close()
+
+
+class AlertDispatcher:
+    def __init__(self, alert_manager):
+        """
+        Deliver posture events to any number of sinks, each on its own worker thread,
+        so a slow sink never adds latency to the detection loop.
+        - alert_manager: PostureAlertManager that records the alert state from transitions.
+        """
+        self.alert_manager = alert_manager
+        self.workers = []
+
+    def register(self, sink, policy=None, max_queue=16):
+        """Add a sink; policy defaults to the sink's own policy."""
+        self.workers.append(_SinkWorker(sink, policy or sink.policy, max_queue))
+        return sink
+
+    def publish(self, event):
+        """Hand an event to every sink subscribed to its kind."""
+        for worker in self.workers:
+            if event.kind in worker.sink.event_kinds:
+                worker.offer(event)
+
+    def publish_transition(self, transition, methods):
+        """Record a PostureTransition with the alert manager and publish it."""
+        self.alert_manager.handle_transition(transition)
+        self.publish(make_event(
+            TRANSITION, transition.timestamp, transition.state, methods,
+            transition.angle, transition.horizontal_distance,
+        ))
+
+    def wants(self, kind):
+        """Return True if any sink is subscribed to this event kind."""
+        return any(kind in worker.sink.event_kinds for worker in self.workers)
+
+    def stats(self):
+        """Return delivered and dropped event counts per sink."""
+        return {
+            type(worker.sink).__name__: {"delivered": worker.delivered, "dropped": worker.dropped}
+            for worker in self.workers
+        }
+
+    def close(self, timeout=1.0):
+        for worker in self.workers:
+            worker.close(timeout)
+        self.workers = []
@@ -1,4 +1,7 @@
-class GUIWarning:
+from components.posture_evaluation import BAD
+from components.warnings.dispatcher import AlertSink
+
+class GUIWarning(AlertSink):
     def __init__(self, gui, alert_manager):
         """Initialize the GUI warning system."""
         self.gui = gui
@@ -17,3 +20,7 @@ class GUIWarning:
                 self.gui.set_gui_alert("green")  # Green for good posture
         else:
             self.gui.set_gui_alert("gray")  # Gray when GUI is not active
+
+    def handle(self, event):
+        """Apply a posture event delivered by the AlertDispatcher."""
+        self.update(event.state == BAD, "GUI" if "GUI" in event.methods else None)
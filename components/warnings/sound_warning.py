@@ -1,22 +1,144 @@
+import io
+import math
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from array import array
+
+from components.posture_evaluation import BAD
+from components.warnings.dispatcher import AlertSink
+
 try:
     import winsound
+except ImportError:
+    winsound = None
 
-    def playsound(frequency, duration):
-        winsound.Beep(frequency, duration)
+SAMPLE_RATE = 22050
+
+
+def synthesize_tone(frequency, duration_ms, volume=0.5, sample_rate=SAMPLE_RATE):
+    """Return a mono 16-bit WAV file (as bytes) holding a sine tone with short fades to avoid clicks."""
+    count = int(sample_rate * duration_ms / 1000)
+    fade = max(1, min(count // 10, int(sample_rate * 0.01)))
+    amplitude = volume * 32767
+    samples = array("h", bytes(2 * count))
+    for i in range(count):
+        envelope = min(1.0, i / fade, (count - 1 - i) / fade)
+        samples[i] = int(amplitude * envelope * math.sin(2 * math.pi * frequency * i / sample_rate))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def default_output():
+    """Pick the best available sound output for this machine."""
+    if winsound is not None:
+        return "winsound"
+    if shutil.which("aplay"):
+        return "aplay"
+    return "null"
 
-except ImportError:
-    import os
 
-    def playsound(frequency, duration):
-        os.system('beep -f %s -l %s' % (frequency,duration))
+class AudioAlertWorker:
+    def __init__(self, output=None, frequency=1000, duration_ms=500, cooldown=5.0):
+        """
+        Play alert tones on a background thread.
+        - output: "winsound", "aplay" (ALSA), "null" (discard), or a path to write each tone to as a WAV file.
+          Defaults to the best available output.
+        - cooldown: Minimum seconds between the starts of two tones while the alert stays active.
+        """
+        self.output = output or default_output()
+        self.cooldown = cooldown
+        self.tone = synthesize_tone(frequency, duration_ms)  # Built once, replayed for every alert
+        self.tone_seconds = duration_ms / 1000.0
+        self.plays = 0
 
+        self._active = False
+        self._closed = False
+        self._process = None  # aplay process while a tone is playing
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
 
+    def start_alert(self):
+        """Start (or keep) the alert going; returns immediately."""
+        if not self._active:
+            self._active = True
+            self._wake.set()
 
-class SoundWarning:
-    def __init__(self, alert_manager):
+    def cancel(self):
+        """Stop repeating the alert and cut off a tone that is still playing."""
+        if self._active:
+            self._active = False
+            self._stop_playback()
+            self._wake.set()
+
+    def close(self):
+        self._closed = True
+        self.cancel()
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            while self._active and not self._closed:
+                started = time.monotonic()
+                self._play()
+                # Sleep out the cooldown, waking early if the alert is cancelled
+                remaining = self.cooldown - (time.monotonic() - started)
+                if remaining > 0 and self._wake.wait(remaining):
+                    self._wake.clear()
+
+    def _play(self):
+        self.plays += 1
+        try:
+            if self.output == "winsound":
+                winsound.PlaySound(self.tone, winsound.SND_MEMORY)
+            elif self.output == "aplay":
+                self._process = subprocess.Popen(
+                    ["aplay", "-q", "-"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                self._process.communicate(self.tone)
+                self._process = None
+            elif self.output != "null":
+                with open(self.output, "wb") as file:
+                    file.write(self.tone)
+        except (OSError, RuntimeError) as e:
+            print(f"Error playing alert sound: {e}")
+
+    def _stop_playback(self):
+        if self.output == "winsound":
+            winsound.PlaySound(None, 0)
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+
+class SoundWarning(AlertSink):
+    def __init__(self, alert_manager, output=None, cooldown=5.0):
         """Initialize the sound warning system."""
         self.alert_manager = alert_manager
+        self.worker = AudioAlertWorker(output=output, cooldown=cooldown)
 
     def update(self, is_bad_posture):
+        """Start beeping (every cooldown seconds) while posture is bad; stop as soon as it recovers."""
         if self.alert_manager.should_alert(is_bad_posture):
-            playsound(1000, 500)  # Frequency: 1000Hz, Duration: 500ms
+            self.worker.start_alert()
+        else:
+            self.worker.cancel()
+
+    def handle(self, event):
+        """Apply a posture event delivered by the AlertDispatcher."""
+        self.update(event.state == BAD and "Sound" in event.methods)
+
+    def close(self):
+        self.worker.close()
@@ -1,9 +1,26 @@
+import threading
+from PIL import ImageDraw
 from StreamDeck.DeviceManager import DeviceManager
 from StreamDeck.ImageHelpers import PILHelper
 
-class StreamDeckWarning:
-    def __init__(self, alert_manager):
-        """Initialize Stream Deck and posture tracking variables."""
+from components.posture_evaluation import BAD
+from components.warnings.dispatcher import AlertSink, COALESCE, METHODS_CHANGED, READOUT, TRANSITION
+
+GOOD_COLOR = (0, 255, 0)
+BAD_COLOR = (255, 0, 0)
+PENDING_COLOR = (255, 165, 0)
+READOUT_COLOR = (0, 0, 0)
+
+class StreamDeckWarning(AlertSink):
+    event_kinds = (TRANSITION, METHODS_CHANGED, READOUT)
+    policy = COALESCE
+
+    def __init__(self, alert_manager, readout=True):
+        """
+        Initialize Stream Deck and posture tracking variables.
+        - readout: If True, the last key shows the live angle and the one before it
+          counts down while bad posture is pending.
+        """
         self.streamdecks = DeviceManager().enumerate()
         if not self.streamdecks:
             raise Exception("No Stream Decks found.")
@@ -11,29 +28,116 @@ class StreamDeckWarning:
         self.deck.open()
         self.deck.reset()
         self.alert_manager = alert_manager
+        self.key_count = self.deck.key_count()
+        self.readout = readout and self.key_count >= 3
+
+        self._image_cache = {}  # (color, text) -> native key image
+        self._shown = {}  # key -> (color, text) currently on the device
+        self._pending = {}  # key -> (color, text) waiting for the writer; newer updates replace older ones
+        self._condition = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _native_image(self, color, text=None):
+        """Render a key image once per (color, text) and reuse it afterwards."""
+        cache_key = (color, text)
+        image = self._image_cache.get(cache_key)
+        if image is None:
+            pil_image = PILHelper.create_image(self.deck, background=color)
+            if text:
+                draw = ImageDraw.Draw(pil_image)
+                left, top, right, bottom = draw.textbbox((0, 0), text)
+                position = ((pil_image.width - (right - left)) / 2, (pil_image.height - (bottom - top)) / 2)
+                draw.text(position, text, fill="white")
+            image = self._image_cache[cache_key] = PILHelper.to_native_format(self.deck, pil_image)
+        return image
+
+    def set_key(self, key, color, text=None):
+        """Queue a key update; nothing is sent if the key already shows this state."""
+        state = (tuple(color), text)
+        with self._condition:
+            if self._pending.get(key, self._shown.get(key)) == state:
+                return
+            self._pending[key] = state
+            self._condition.notify()
+
+    def _write_loop(self):
+        """Send queued key updates to the device so USB writes never block the caller."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                pending, self._pending = self._pending, {}
+
+            for key, state in pending.items():
+                if self._shown.get(key) == state:
+                    continue
+                try:
+                    image = self._native_image(*state)
+                    with self.deck:
+                        self.deck.set_key_image(key, image)
+                except Exception as e:
+                    print(f"Error writing to Stream Deck: {e}")
+                    continue
+                with self._condition:
+                    self._shown[key] = state
 
     def set_all_keys_color(self, color):
         """Set all keys on the Stream Deck to a specified color."""
-        for key in range(self.deck.key_count()):
-            image = PILHelper.create_image(self.deck, background=color)
-            self.deck.set_key_image(key, PILHelper.to_native_format(self.deck, image))
+        for key in range(self.key_count):
+            self.set_key(key, color)
+
+    def _status_keys(self):
+        return range(self.key_count - 2) if self.readout else range(self.key_count)
 
     def update_warnings(self, is_bad_posture, frame, angle=None, horizontal_distance=None):
         """
         Update warnings on the Stream Deck after the delay.
         - is_bad_posture: Boolean indicating if the posture is bad.
         """
-        if self.alert_manager.should_alert(is_bad_posture):
-            self.set_all_keys_color((255, 0, 0))  # Red for bad posture
+        color = BAD_COLOR if self.alert_manager.should_alert(is_bad_posture) else GOOD_COLOR
+        for key in self._status_keys():
+            self.set_key(key, color)
+
+    def update_readout(self, angle=None, pending_seconds=0.0, timeout=0):
+        """
+        Refresh the readout keys; only keys whose text changes are redrawn.
+        - angle: Current angle, or None when nobody is detected.
+        - pending_seconds: How long bad posture has lasted so far.
+        - timeout: Seconds of bad posture before the alert fires.
+        """
+        if not self.readout:
+            return
+        angle_key, countdown_key = self.key_count - 1, self.key_count - 2
+        self.set_key(angle_key, READOUT_COLOR, f"{int(angle)}°" if angle is not None else "--")
+
+        remaining = timeout - pending_seconds
+        if pending_seconds > 0 and remaining > 0:
+            self.set_key(countdown_key, PENDING_COLOR, f"{int(remaining) + 1}s")
+        else:
+            self.set_key(countdown_key, READOUT_COLOR)
+
+    def handle(self, event):
+        """Apply a posture event delivered by the AlertDispatcher."""
+        if event.kind == READOUT:
+            self.update_readout(event.angle, event.pending_seconds, event.timeout)
         else:
-            self.set_all_keys_color((0, 255, 0))  # Green for good posture
+            is_bad_posture = event.state == BAD and "StreamDeck" in event.methods
+            self.update_warnings(is_bad_posture, None, event.angle, event.horizontal_distance)
 
     def reset(self):
         """Reset posture warnings and Stream Deck state."""
-        self.alert_manager.bad_posture_start_time = None
-        self.set_all_keys_color((0, 255, 0))
+        self.alert_manager.reset()
+        self.set_all_keys_color(GOOD_COLOR)
 
     def close(self):
         """Close the Stream Deck connection."""
-        self.deck.reset()
-        self.deck.close()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer.join(timeout=1.0)
+        with self.deck:
+            self.deck.reset()
+            self.deck.close()
@@ -0,0 +1,60 @@
+import json
+import socket
+import urllib.request
+
+from components.warnings.dispatcher import AlertSink, DROP, event_to_dict
+
+class WebhookWarning(AlertSink):
+    policy = DROP
+
+    def __init__(self, url, timeout=2.0):
+        """
+        POST every posture event as JSON to a local HTTP endpoint.
+        - url: Endpoint such as http://127.0.0.1:8080/posture.
+        """
+        self.url = url
+        self.timeout = timeout
+
+    def handle(self, event):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(event_to_dict(event)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class UnixSocketWarning(AlertSink):
+    policy = DROP
+
+    def __init__(self, path, timeout=2.0):
+        """
+        Write every posture event as a JSON line to a UNIX stream socket.
+        - path: Socket path; the connection is (re)opened on demand.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._socket = None
+
+    def handle(self, event):
+        line = (json.dumps(event_to_dict(event)) + "\n").encode("utf-8")
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            try:
+                self._socket.connect(self.path)
+            except OSError:
+                self.close()
+                raise
+        try:
+            self._socket.sendall(line)
+        except OSError:
+            self.close()  # Reconnect on the next event
+            raise
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
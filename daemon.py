@@ -0,0 +1,88 @@
+"""
+Run posture detection as a background service, without the settings window.
+
+Settings come from settings.txt; command line options override them. Send SIGHUP
+to re-read the file and SIGTERM (or Ctrl+C) to stop.
+
+    python daemon.py --alert-method Sound --timeout 5
+"""
+import time
+STARTED = time.perf_counter()  # Start of the --profile-startup timeline
+import argparse
+import signal
+import threading
+
+from components.settings import SETTINGS_FILE, HeadlessSettings
+from components.startup import StartupProfile, load_dlls
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run posture detection without the GUI.")
+    parser.add_argument("--settings", default=SETTINGS_FILE, help="Settings JSON file (default: settings.txt)")
+    parser.add_argument("--alert-method", choices=("Sound", "StreamDeck", "GUI"))
+    parser.add_argument("--alert-sinks", nargs="*", help="Alert methods to keep active besides --alert-method")
+    parser.add_argument("--angle-threshold", type=float)
+    parser.add_argument("--distance-threshold-ratio", type=float)
+    parser.add_argument("--timeout", type=float, help="Seconds of bad posture before alerting")
+    parser.add_argument("--webhook-url", help="POST every posture state change to this local URL")
+    parser.add_argument("--alert-socket", help="Write every posture state change to this UNIX socket")
+    parser.add_argument("--stats-reporter", choices=("log", "json"))
+    parser.add_argument("--metrics-address",
+                        help="Serve metrics over HTTP on host:port, a port, or unix:/path/to.sock")
+    parser.add_argument("--show-camera", action="store_true", default=None, help="Show the camera feed window")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print how long each startup phase took once the first frame is evaluated")
+    parser.add_argument("--gui", action="store_true", help="Open the settings window instead (same as main.py)")
+    return parser.parse_args(argv)
+
+
+def settings_overrides(args):
+    """Return the settings.txt keys given on the command line."""
+    overrides = {
+        "alert_method": args.alert_method,
+        "alert_sinks": args.alert_sinks,
+        "angle_threshold": args.angle_threshold,
+        "distance_threshold_ratio": args.distance_threshold_ratio,
+        "timeout": args.timeout,
+        "webhook_url": args.webhook_url,
+        "alert_socket": args.alert_socket,
+        "stats_reporter": args.stats_reporter,
+        "metrics_address": args.metrics_address,
+        "show_camera": args.show_camera,
+    }
+    return {key: value for key, value in overrides.items() if value is not None}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_dlls()
+    startup = StartupProfile(enabled=args.profile_startup, origin=STARTED)
+    if args.gui:
+        from main import run_gui  # Tkinter is only imported when the window is wanted
+        run_gui(startup)
+        return
+
+    # Imported here so --help and --gui don't pay for OpenCV and MediaPipe
+    with startup.phase("import detection"):
+        from components.detection_loop import create_stats, start_posture_detection
+
+    app = HeadlessSettings(args.settings, settings_overrides(args))
+    if app.settings["alert_method"] == "GUI":
+        print("The GUI alert method has no effect without the settings window; use --alert-method or alert_sinks")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    if hasattr(signal, "SIGHUP"):  # Not available on Windows
+        signal.signal(signal.SIGHUP, lambda *_: app.reload())
+
+    stats, reporters = create_stats(app)
+    try:
+        start_posture_detection(app, stats, stop_event, startup)
+    finally:
+        for reporter in reporters:
+            reporter.stop()
+
+
+if __name__ == "__main__":
+    main()
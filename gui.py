@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, StringVar
-import os
-import json
+from components.settings import SettingsSnapshot, SETTINGS_FILE, load_settings, save_settings
 
 class PostureGUI:
-    SETTINGS_FILE = "settings.txt"
+    SETTINGS_FILE = SETTINGS_FILE
 
     def __init__(self, root, default_angle=160, default_distance_ratio=0.05, default_alert_method="GUI", default_timeout=3):
         """
@@ -21,6 +20,18 @@ class PostureGUI:
         self.distance_threshold_ratio = tk.DoubleVar(value=self.settings["distance_threshold_ratio"])
         self.alert_method = StringVar(value=self.settings["alert_method"])
         self.timeout = tk.IntVar(value=self.settings["timeout"])
+        self.show_camera = tk.BooleanVar(value=False)  # Default: hide camera feed
+
+        # Worker threads read settings from this snapshot instead of the Tk variables
+        self.snapshot = self._build_snapshot()
+        for variable in (self.angle_threshold, self.distance_threshold_ratio, self.alert_method,
+                         self.timeout, self.show_camera):
+            variable.trace_add("write", self._publish_snapshot)
+
+        # Warning box color requested by worker threads, applied on the Tk thread
+        self._pending_alert_color = None
+        self._shown_alert_color = None
+        self._pending_stats = None  # (stats, interval_ms) for a stats panel requested by the detection thread
 
         # Configure styles
         self.style = ttk.Style()
@@ -29,6 +40,7 @@ class PostureGUI:
         # Create GUI elements
         self.create_widgets()
         self.apply_theme()  # Apply the initial theme
+        self._apply_ui_updates()
 
     def create_widgets(self):
         """Create the GUI widgets."""
@@ -67,7 +79,6 @@ class PostureGUI:
         self.timeout_slider.pack(fill=tk.X, padx=20)
 
         # Show Camera Feed Toggle
-        self.show_camera = tk.BooleanVar(value=False)  # Default: show camera feed
         ttk.Checkbutton(
             self.root, text="Show Camera Feed", variable=self.show_camera, style="TCheckbutton"
         ).pack(pady=10)
@@ -122,68 +133,102 @@ class PostureGUI:
 
     def load_settings(self, default_angle, default_distance_ratio, default_alert_method, default_timeout):
         """Load settings from the settings file or use defaults."""
-        if os.path.exists(self.SETTINGS_FILE):
-            try:
-                with open(self.SETTINGS_FILE, "r") as file:
-                    settings = json.load(file)
-                
-                # Ensure all keys exist; add missing keys with default values
-                settings.setdefault("angle_threshold", default_angle)
-                settings.setdefault("distance_threshold_ratio", default_distance_ratio)
-                settings.setdefault("alert_method", default_alert_method)
-                settings.setdefault("timeout", default_timeout)
-
-                return settings
-            except Exception as e:
-                print(f"Error reading settings file: {e}")
-
-        # Return default settings if file doesn't exist or is corrupted
-        return {
+        return load_settings(self.SETTINGS_FILE, {
             "angle_threshold": default_angle,
             "distance_threshold_ratio": default_distance_ratio,
             "alert_method": default_alert_method,
             "timeout": default_timeout,
-        }
+        })
 
     def save_settings(self):
         """Save the current settings to the settings file."""
-        settings = {
+        settings = dict(self.settings)  # Keep keys that have no widget, e.g. stats_reporter
+        settings.update({
             "angle_threshold": self.angle_threshold.get(),
             "distance_threshold_ratio": self.distance_threshold_ratio.get(),
             "alert_method": self.alert_method.get(),
             "timeout": self.timeout.get(),
-        }
-        try:
-            with open(self.SETTINGS_FILE, "w") as file:
-                json.dump(settings, file)
-        except Exception as e:
-            print(f"Error saving settings file: {e}")
+        })
+        save_settings(settings, self.SETTINGS_FILE)
 
     def exit_gui(self):
         """Exit the GUI and save settings."""
         self.save_settings()
         self.root.destroy()
 
+    def _build_snapshot(self):
+        return SettingsSnapshot(
+            angle_threshold=self.angle_threshold.get(),
+            distance_threshold_ratio=self.distance_threshold_ratio.get(),
+            alert_method=self.alert_method.get(),
+            timeout=self.timeout.get(),
+            show_camera=self.show_camera.get(),
+        )
+
+    def _publish_snapshot(self, *args):
+        """Variable trace callback: replace the settings snapshot (runs on the Tk thread)."""
+        try:
+            self.snapshot = self._build_snapshot()
+        except tk.TclError:
+            pass  # A variable holds a partial value; keep the previous snapshot
+
+    def get_settings(self):
+        """Return the current SettingsSnapshot; safe to call from any thread."""
+        return self.snapshot
+
     def get_angle_threshold(self):
         """Return the current angle threshold."""
-        return self.angle_threshold.get()
+        return self.snapshot.angle_threshold
 
     def get_distance_threshold_ratio(self):
         """Return the current distance threshold ratio."""
-        return self.distance_threshold_ratio.get()
+        return self.snapshot.distance_threshold_ratio
 
     def get_alert_method(self):
         """Return the selected alert method."""
-        return self.alert_method.get()
+        return self.snapshot.alert_method
 
     def get_timeout(self):
         """Return the timeout setting."""
-        return self.timeout.get()
+        return self.snapshot.timeout
 
     def is_camera_enabled(self):
         """Return whether the camera feed should be displayed."""
-        return self.show_camera.get()
+        return self.snapshot.show_camera
 
     def set_gui_alert(self, color):
-        """Update the warning box color."""
-        self.warning_box.configure(bg=color)
+        """Request a warning box color; safe to call from any thread."""
+        self._pending_alert_color = color
+
+    def _apply_ui_updates(self, interval_ms=50):
+        """Apply warning box colors and panels requested by worker threads, on the Tk thread."""
+        color = self._pending_alert_color
+        if color is not None and color != self._shown_alert_color:
+            self.warning_box.configure(bg=color)
+            self._shown_alert_color = color
+        if self._pending_stats is not None:
+            stats, stats_interval_ms = self._pending_stats
+            self._pending_stats = None
+            self._create_stats_panel(stats, stats_interval_ms)
+        self.root.after(interval_ms, self._apply_ui_updates)
+
+    def show_stats(self, stats, interval_ms=1000):
+        """Request a panel with live pipeline stats; safe to call from any thread."""
+        self._pending_stats = (stats, interval_ms)
+
+    def _create_stats_panel(self, stats, interval_ms):
+        """Show a panel with live pipeline stats, refreshed from the Tk thread."""
+        self.stats_label = tk.Label(self.root, justify=tk.LEFT, anchor="w", font=("Courier", 9))
+        self.stats_label.pack(fill=tk.X, padx=20, pady=10)
+
+        def refresh():
+            snapshot = stats.snapshot()
+            lines = [f"{name}: {value}" for name, value in sorted(snapshot["counters"].items())]
+            lines += [
+                f"{name}: p50 {s['p50_ms']:.1f} ms / p95 {s['p95_ms']:.1f} ms"
+                for name, s in snapshot["stages"].items()
+            ]
+            self.stats_label.configure(text="\n".join(lines))
+            self.root.after(interval_ms, refresh)
+
+        refresh()
@@ -0,0 +1,89 @@
+"""
+Monitor several desks or camera angles from one machine.
+
+Each source gets its own posture evaluator and alert state, while pose inference
+is shared by a fixed pool of worker processes.
+
+    python monitor_streams.py 0 1 rtsp://127.0.0.1:8554/desk3 --workers 4 --fps 5
+"""
+import os
+os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+import argparse
+import json
+import signal
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from components.stream_pool import StreamMonitor
+from components.warnings.console_warning import ConsoleWarning
+from components.warnings.webhook_warning import WebhookWarning
+
+
+def parse_source(source):
+    """Treat plain integers as camera device indices."""
+    return int(source) if source.isdigit() else source
+
+
+def with_query_parameter(url, name, value):
+    """Return url with name=value added to its query string, keeping any parameters it already has."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(name, value)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor posture on several video sources at once.")
+    parser.add_argument("sources", nargs="+", help="Camera indices, video files or stream URLs")
+    parser.add_argument("--workers", type=int, help="Pose inference processes (default: CPU cores - 1)")
+    parser.add_argument("--fps", type=float, default=5, help="Inference budget per stream")
+    parser.add_argument("--angle-threshold", type=float, default=160)
+    parser.add_argument("--distance-threshold-ratio", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=3, help="Seconds of bad posture before alerting")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2))
+    parser.add_argument("--webhook", help="Also POST each stream's state changes to this URL")
+    parser.add_argument("--history-dir", help="Log each stream's posture history to a file in this directory")
+    parser.add_argument("--status-interval", type=float, default=30, help="Seconds between status prints (0 = off)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def sinks_for(name):
+        sinks = [ConsoleWarning(name)]
+        if args.webhook:
+            sinks.append(WebhookWarning(with_query_parameter(args.webhook, "stream", name)))
+        return sinks
+
+    monitor = StreamMonitor(
+        [parse_source(source) for source in args.sources],
+        workers=args.workers,
+        fps=args.fps,
+        detector_options={"model_complexity": args.model_complexity},
+        evaluator_options={
+            "angle_threshold": args.angle_threshold,
+            "distance_threshold_ratio": args.distance_threshold_ratio,
+            "timeout": args.timeout,
+        },
+        sink_factory=sinks_for,
+        history_dir=args.history_dir,
+    )
+    signal.signal(signal.SIGINT, lambda *_: monitor.stop())
+    signal.signal(signal.SIGTERM, lambda *_: monitor.stop())
+
+    def print_status(stop_event):
+        while not stop_event.wait(args.status_interval):
+            print(json.dumps(monitor.status()))
+
+    stop_status = threading.Event()
+    if args.status_interval > 0:
+        threading.Thread(target=print_status, args=(stop_status,), daemon=True).start()
+    try:
+        monitor.run()
+    finally:
+        stop_status.set()
+        monitor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Summarize a posture history log written by main.py, daemon.py or monitor_streams.py.
+
+    python posture_report.py posture.history --days 30
+    python posture_report.py posture.history --days 7 --daily
+"""
+import argparse
+import time
+
+import numpy as np
+
+from components.history import PostureHistory
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Report the share of bad posture over time.")
+    parser.add_argument("history", help="Posture history file (\"history_file\" in settings.txt)")
+    parser.add_argument("--days", type=float, default=30, help="How far back to report")
+    parser.add_argument("--daily", action="store_true", help="One line per day instead of per hour")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    history = PostureHistory(args.history)
+    rows = history.hourly(start=time.time() - args.days * 86400)
+    rows = rows[rows["present_frames"] > 0]
+    if not len(rows):
+        print("No posture recorded in this period.")
+        return
+
+    if args.daily:
+        # Group the hourly rollups by local calendar day
+        days = np.array([time.strftime("%Y-%m-%d", time.localtime(hour)) for hour in rows["hour"]])
+        labels, inverse = np.unique(days, return_inverse=True)
+        present = np.bincount(inverse, weights=rows["present_frames"])
+        bad = np.bincount(inverse, weights=rows["bad_frames"])
+        angle_sum = np.bincount(inverse, weights=rows["angle_sum"])
+    else:
+        labels = [time.strftime("%Y-%m-%d %H:00", time.localtime(hour)) for hour in rows["hour"]]
+        present, bad, angle_sum = rows["present_frames"], rows["bad_frames"], rows["angle_sum"]
+
+    print(f"{'period':<18}{'frames':>10}{'bad %':>8}{'mean angle':>12}")
+    for label, present_frames, bad_frames, angles in zip(labels, present, bad, angle_sum):
+        print(f"{label:<18}{int(present_frames):>10}{bad_frames * 100.0 / present_frames:>8.1f}"
+              f"{angles / present_frames:>12.1f}")
+    total_present, total_bad = rows["present_frames"].sum(), rows["bad_frames"].sum()
+    print(f"{'total':<18}{int(total_present):>10}{total_bad * 100.0 / total_present:>8.1f}"
+          f"{rows['angle_sum'].sum() / total_present:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Read the metrics of a running PostureFix instance, as a monitoring system would.
+
+    python scrape_metrics.py 9464
+    python scrape_metrics.py unix:/tmp/posturefix.sock --json
+"""
+import argparse
+import json
+
+from components.metrics_server import fetch_metrics
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape a PostureFix metrics endpoint.")
+    parser.add_argument("address", help="\"metrics_address\" of the instance: host:port, a port, or unix:/path")
+    parser.add_argument("--json", action="store_true", help="Fetch /status as JSON instead of Prometheus text")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        body = fetch_metrics(args.address, "/status" if args.json else "/metrics", args.timeout)
+    except OSError as e:
+        raise SystemExit(f"Could not scrape {args.address}: {e}")
+    if args.json:
+        print(json.dumps(json.loads(body), indent=2))
+    else:
+        print(body, end="")
+
+
+if __name__ == "__main__":
+    main()